@@ -5,6 +5,7 @@ echo "Starting PWA proxy on port 5004 (background)..."
 python pwa/server.py &
 PWA_PID=$!
 
-echo "Starting Trading App backend on port 5003..."
+echo "Starting Trading App backend on port ${PORT:-5003}..."
 trap "kill $PWA_PID 2>/dev/null; exit" TERM INT
-exec python server.py
+exec gunicorn --worker-class gthread --workers 1 --threads 32 \
+     --bind "0.0.0.0:${PORT:-5003}" wsgi:application
@@ -16,9 +16,10 @@ Usage:
 Environment variables (can also be set in ../.env):
   PWA_PORT    Port this proxy listens on  (default: 5004)
   BACKEND_URL URL of standalone_server.py (default: http://127.0.0.1:5003)
+  PWA_WORKERS Worker threads serving connections (default: 32)
 """
 
-import os, json, urllib.request, urllib.error, socketserver
+import os, json, gzip, queue, select, hashlib, threading, http.client, urllib.request
 from http.server import BaseHTTPRequestHandler, HTTPServer
 from urllib.parse import urlparse
 
@@ -46,6 +47,83 @@ _load_env()
 
 PORT        = int(os.getenv('PWA_PORT', 5004))
 BACKEND_URL = os.getenv('BACKEND_URL', 'http://127.0.0.1:5003').rstrip('/')
+WORKERS     = int(os.getenv('PWA_WORKERS', 32))
+
+# Parsed once — every proxied request reuses these instead of re-parsing the URL
+_BACKEND      = urlparse(BACKEND_URL)
+_BACKEND_PATH = _BACKEND.path
+_BACKEND_CONN = (http.client.HTTPSConnection if _BACKEND.scheme == 'https'
+                 else http.client.HTTPConnection)
+
+# ── Backend connection pool ───────────────────────────────────────────────
+# Idle keep-alive connections to the backend, shared by all handler threads,
+# so each proxied request skips the TCP (and TLS) handshake.
+
+_POOL_MAX     = 32
+_STREAM_CHUNK = 64 * 1024   # copy size for streamed (non-HTML) response bodies
+_pool: list[http.client.HTTPConnection] = []
+_pool_lock = threading.Lock()
+
+
+def _dropped(conn: http.client.HTTPConnection) -> bool:
+    """True if the backend has closed an idle connection.
+
+    An idle socket with anything to read has hit EOF (or holds stray data);
+    either way it can't carry a request. One with no socket reconnects itself.
+    """
+    return conn.sock is not None and bool(select.select([conn.sock], [], [], 0)[0])
+
+
+def _pool_get() -> http.client.HTTPConnection:
+    """Take a live idle backend connection, or open a new one if none is free."""
+    while True:
+        with _pool_lock:
+            if not _pool:
+                break
+            conn = _pool.pop()
+        if not _dropped(conn):
+            return conn
+        conn.close()
+    return _BACKEND_CONN(_BACKEND.hostname, _BACKEND.port, timeout=15)
+
+
+def _pool_put(conn: http.client.HTTPConnection):
+    """Return a connection whose response has been fully read."""
+    with _pool_lock:
+        if len(_pool) < _POOL_MAX:
+            _pool.append(conn)
+            return
+    conn.close()
+
+
+def _backend_request(method: str, path: str, body: bytes | None, headers: dict):
+    """Send a request over a pooled connection. Returns (conn, response).
+
+    A reused socket may have been closed by the backend while idle; in that
+    case the request is retried once on a fresh connection. Once it has been
+    sent, only GET/HEAD are retried: the backend may already have acted on a
+    POST (e.g. placed an order) before the connection dropped.
+    """
+    conn   = _pool_get()
+    reused = conn.sock is not None
+    sent   = False
+    try:
+        conn.request(method, path, body=body, headers=headers)
+        sent = True
+        return conn, conn.getresponse()
+    except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+        conn.close()
+        if not reused or (sent and method not in ('GET', 'HEAD')):
+            raise
+    except Exception:
+        conn.close()
+        raise
+    try:
+        conn.request(method, path, body=body, headers=headers)
+        return conn, conn.getresponse()
+    except Exception:
+        conn.close()
+        raise
 
 # ── Static PWA files ──────────────────────────────────────────────────────
 
@@ -56,14 +134,19 @@ _MIME = {
     'style.css':     'text/css; charset=utf-8',
 }
 
-_STATIC: dict[str, bytes] = {}
+# path -> (raw bytes, gzipped bytes, ETag, gzip ETag), all computed once here
+_STATIC: dict[str, tuple[bytes, bytes, str, str]] = {}
 for _fname in _MIME:
     _fpath = os.path.join(BASE_DIR, _fname)
     try:
         with open(_fpath, encoding='utf-8') as _f:
-            _STATIC[f'/{_fname}'] = _f.read().encode('utf-8')
+            _data = _f.read().encode('utf-8')
     except FileNotFoundError:
         print(f"  Warning: pwa/{_fname} not found — will be skipped")
+        continue
+    _digest = hashlib.sha256(_data).hexdigest()[:32]
+    _STATIC[f'/{_fname}'] = (_data, gzip.compress(_data, 9),
+                             f'"{_digest}"', f'"{_digest}-gz"')
 
 # ── PWA injection snippets ────────────────────────────────────────────────
 
@@ -89,32 +172,90 @@ _PWA_BODY = (
 )
 
 
-def _inject_pwa(html: str) -> str:
-    """Inject manifest link + SW registration into HTML."""
-    html = html.replace('</head>', _PWA_HEAD + '</head>', 1)
-    html = html.replace('</body>', _PWA_BODY + '</body>', 1)
-    return html
+# Pre-encoded once so injection works on the raw response bytes
+_HEAD_CLOSE = b'</head>'
+_BODY_CLOSE = b'</body>'
+_PWA_HEAD_B = _PWA_HEAD.encode('utf-8')
+_PWA_BODY_B = _PWA_BODY.encode('utf-8')
+
+
+def _inject_pwa(raw: bytes) -> bytes:
+    """Inject manifest link + SW registration into an HTML document."""
+    i = raw.find(_HEAD_CLOSE)
+    j = raw.find(_BODY_CLOSE, max(i, 0))
+    if i >= 0 and j >= 0:
+        # One scan for both tags, then a single pre-sized join
+        return b''.join((raw[:i], _PWA_HEAD_B, raw[i:j], _PWA_BODY_B, raw[j:]))
+    raw = raw.replace(_HEAD_CLOSE, _PWA_HEAD_B + _HEAD_CLOSE, 1)
+    raw = raw.replace(_BODY_CLOSE, _PWA_BODY_B + _BODY_CLOSE, 1)
+    return raw
+
+
+# ── Header filtering ──────────────────────────────────────────────────────
+
+# RFC 7230 §6.1 hop-by-hop headers — meaningful for one connection only
+_HOP_BY_HOP = frozenset({
+    'connection', 'keep-alive', 'proxy-authenticate', 'proxy-authorization',
+    'te', 'trailer', 'trailers', 'transfer-encoding', 'upgrade',
+})
+# Request headers that http.client sets itself for the backend hop
+_SKIP_REQUEST = _HOP_BY_HOP | {'host', 'content-length'}
+# Response headers this handler (or send_response) emits itself
+_SKIP_RESPONSE = _HOP_BY_HOP | {'content-length', 'server', 'date'}
+
+
+# ── Error page ────────────────────────────────────────────────────────────
+# Encoded once; only the exception text in the middle varies per failure
+
+_ERR_PREFIX = b'<h3>Proxy Error</h3><pre>'
+_ERR_SUFFIX = (
+    f'</pre>\n<p>Is server.py running at {BACKEND_URL}? '
+    f'Try: <a href="{BACKEND_URL}/api/ping">{BACKEND_URL}/api/ping</a></p>'
+).encode('utf-8')
 
 
 # ── Handler ───────────────────────────────────────────────────────────────
 
 class ProxyHandler(BaseHTTPRequestHandler):
 
+    # Drop idle/stalled client sockets so they can't pin a worker forever
+    timeout = 30
+
     def log_message(self, fmt, *args):
         print(f"  [{self.address_string()}] {fmt % args}")
 
     # ── helpers ──
 
     def _serve_static(self, path: str) -> bool:
-        """Serve a PWA static file. Returns True if handled."""
-        data = _STATIC.get(path)
-        if data is None:
+        """Serve a PWA static file. Returns True if handled.
+
+        Files are sent gzipped when the client accepts it, and a matching
+        If-None-Match is answered with a bodyless 304.
+        """
+        entry = _STATIC.get(path)
+        if entry is None:
             return False
+        data, gzipped, etag, etag_gz = entry
+        use_gzip = 'gzip' in self.headers.get('Accept-Encoding', '')
+        if use_gzip:
+            data, etag = gzipped, etag_gz
+        # no-cache (not immutable): these URLs are unversioned, so browsers
+        # must revalidate — an unchanged file costs only a 304
+        if etag in self.headers.get('If-None-Match', ''):
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Cache-Control', 'no-cache')
+            self.end_headers()
+            return True
         fname = path.lstrip('/')
         ctype = _MIME.get(fname, 'application/octet-stream')
         self.send_response(200)
         self.send_header('Content-Type', ctype)
+        if use_gzip:
+            self.send_header('Content-Encoding', 'gzip')
         self.send_header('Content-Length', str(len(data)))
+        self.send_header('ETag', etag)
+        self.send_header('Vary', 'Accept-Encoding')
         self.send_header('Cache-Control', 'no-cache')
         self.end_headers()
         self.wfile.write(data)
@@ -122,64 +263,83 @@ class ProxyHandler(BaseHTTPRequestHandler):
 
     def _proxy(self, method: str, body: bytes | None = None):
         """Forward the request to BACKEND_URL, inject PWA tags if HTML."""
-        url = BACKEND_URL + self.path
-        # Copy headers, skip hop-by-hop ones
-        headers = {
-            k: v for k, v in self.headers.items()
-            if k.lower() not in ('host', 'content-length', 'transfer-encoding')
-        }
+        # Copy headers, skip hop-by-hop ones (the backend link manages its own
+        # keep-alive, so the client's Connection header is not forwarded)
+        headers = {k: v for k, v in self.headers.items()
+                   if k.lower() not in _SKIP_REQUEST}
         if body:
             headers['Content-Length'] = str(len(body))
 
-        req = urllib.request.Request(url, data=body, headers=headers, method=method)
+        conn = None
         try:
-            with urllib.request.urlopen(req, timeout=15) as resp:
-                ctype  = resp.headers.get('Content-Type', '')
-                raw    = resp.read()
-                status = resp.status
-
-                # Inject PWA tags into HTML pages
-                if 'text/html' in ctype:
-                    html = raw.decode('utf-8', errors='replace')
-                    html = _inject_pwa(html)
-                    raw  = html.encode('utf-8')
-
-                try:
-                    self.send_response(status)
-                    for k, v in resp.headers.items():
-                        # Skip headers we're managing ourselves
-                        if k.lower() in ('content-length', 'transfer-encoding',
-                                         'content-encoding'):
-                            continue
-                        self.send_header(k, v)
-                    self.send_header('Content-Length', str(len(raw)))
-                    self.end_headers()
-                    self.wfile.write(raw)
-                except (ConnectionAbortedError, BrokenPipeError):
-                    pass  # Browser closed the connection — harmless
-
-        except urllib.error.HTTPError as e:
-            raw = e.read()
+            conn, resp = _backend_request(method, _BACKEND_PATH + self.path,
+                                          body, headers)
+            ctype = resp.headers.get('Content-Type', '').lower()
+            raw   = None
+            # Inject PWA tags into HTML pages — this needs the whole document,
+            # so only HTML is buffered; everything else is streamed below
+            if 'text/html' in ctype:
+                raw = resp.read()
+                if resp.headers.get('Content-Encoding') == 'gzip':
+                    raw = gzip.decompress(raw)
+                raw = _inject_pwa(raw)
+
+        except Exception as exc:
+            # Any failure here is the backend's (nothing is written to the
+            # browser yet), so it is always answered with a 502
+            if conn is not None:
+                conn.close()
+            body = _ERR_PREFIX + str(exc).encode('utf-8', 'replace') + _ERR_SUFFIX
             try:
-                self.send_response(e.code)
-                self.send_header('Content-Type', e.headers.get('Content-Type', 'text/plain'))
-                self.send_header('Content-Length', str(len(raw)))
+                self.send_response(502)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
                 self.end_headers()
-                self.wfile.write(raw)
+                self.wfile.write(body)
             except (ConnectionAbortedError, BrokenPipeError):
-                pass
+                pass  # Browser closed the connection too — harmless
+            return
 
+        try:
+            self.send_response(resp.status)
+            for k, v in resp.headers.items():
+                # Skip headers we're managing ourselves
+                k_lower = k.lower()
+                if k_lower in _SKIP_RESPONSE:
+                    continue
+                if raw is not None and k_lower == 'content-encoding':
+                    continue
+                self.send_header(k, v)
+            if raw is not None:
+                self.send_header('Content-Length', str(len(raw)))
+                self.end_headers()
+                self.wfile.write(raw)
+            else:
+                # Keep the backend's Content-Length when it sent one; a chunked
+                # body arrives de-chunked and is delimited by closing instead
+                length = resp.headers.get('Content-Length')
+                if length is not None:
+                    self.send_header('Content-Length', length)
+                else:
+                    self.close_connection = True
+                self.end_headers()
+                # read1 hands back whatever has arrived (at most one chunk), so
+                # event streams are relayed as they are produced
+                while chunk := resp.read1(_STREAM_CHUNK):
+                    self.wfile.write(chunk)
+                resp.read()     # consume the end of the body so the conn is reusable
         except (ConnectionAbortedError, BrokenPipeError):
-            pass  # Browser disconnected before we even fetched — harmless
-
+            pass  # Browser closed the connection — harmless
         except Exception as exc:
-            msg = f'<h3>Proxy Error</h3><pre>{exc}</pre>\n<p>Is server.py running at {BACKEND_URL}? Try: <a href="{BACKEND_URL}/api/ping">{BACKEND_URL}/api/ping</a></p>'
-            body = msg.encode('utf-8')
-            self.send_response(502)
-            self.send_header('Content-Type', 'text/html; charset=utf-8')
-            self.send_header('Content-Length', str(len(body)))
-            self.end_headers()
-            self.wfile.write(body)
+            # Backend failed mid-body; headers are already out, so just drop it
+            self.log_error('Proxy stream aborted: %s', exc)
+            self.close_connection = True
+        finally:
+            # Only a fully-read response leaves the backend socket reusable
+            if resp.isclosed():
+                _pool_put(conn)
+            else:
+                conn.close()
 
     # ── routes ──
 
@@ -194,8 +354,41 @@ class ProxyHandler(BaseHTTPRequestHandler):
         self._proxy('POST', body)
 
 
-class _ThreadingServer(socketserver.ThreadingMixIn, HTTPServer):
-    daemon_threads = True
+class _PooledServer(HTTPServer):
+    """Serve each connection on a fixed pool of worker threads.
+
+    Avoids creating and tearing down an OS thread per connection, and caps
+    concurrency so a burst of requests can't pile up unbounded threads.
+    The workers are daemon threads, like the daemon_threads server this
+    replaced: a worker relaying an event stream is blocked on the backend,
+    and must not keep the process alive after Ctrl+C.
+    """
+
+    def __init__(self, server_address, handler_class, workers=WORKERS):
+        self._requests = queue.SimpleQueue()
+        self._workers  = workers
+        super().__init__(server_address, handler_class)
+        for n in range(workers):
+            threading.Thread(target=self._worker, name=f'pwa_{n}',
+                             daemon=True).start()
+
+    def process_request(self, request, client_address):
+        self._requests.put((request, client_address))
+
+    def _worker(self):
+        while (item := self._requests.get()) is not None:
+            request, client_address = item
+            try:
+                self.finish_request(request, client_address)
+            except Exception:
+                self.handle_error(request, client_address)
+            finally:
+                self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        for _ in range(self._workers):
+            self._requests.put(None)    # idle workers exit; busy ones are daemons
 
 
 # ── Entry point ───────────────────────────────────────────────────────────
@@ -208,6 +401,7 @@ if __name__ == '__main__':
     print(f"PWA Proxy  →  http://127.0.0.1:{PORT}")
     print(f"Backend    →  {BACKEND_URL}")
     print(f"PWA files  →  {BASE_DIR}")
+    print(f"Workers    →  {WORKERS}")
     # Quick ping to confirm backend is up
     try:
         with urllib.request.urlopen(f"{BACKEND_URL}/api/ping", timeout=3) as r:
@@ -216,8 +410,10 @@ if __name__ == '__main__':
         print(f"Backend    →  WARNING: backend not reachable — {e}")
         print(f"             Start server.py first, then retry.\n")
 
-    server = _ThreadingServer(('0.0.0.0', PORT), ProxyHandler)
+    server = _PooledServer(('0.0.0.0', PORT), ProxyHandler)
     try:
         server.serve_forever()
     except KeyboardInterrupt:
         print("\nStopped.")
+    finally:
+        server.server_close()
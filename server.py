@@ -3,17 +3,25 @@
 Trading App — OpenAlgo Web Interface
 Flask-based, reads credentials from .env, instrument config from settings.json
 Port: 5003  (override with PORT env var or .env PORT=xxxx)
+Production: serve wsgi.py with gunicorn (see that file) instead of app.run
 """
 
 import os
-import json
 import datetime
 import time
 import logging
-import urllib.request
-import urllib.error
-
-from flask import Flask, render_template, request, jsonify, redirect, url_for
+import functools
+import queue
+import select
+import tempfile
+import threading
+import http.client
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+import orjson
+from flask import Flask, Response, render_template, request, jsonify, redirect, url_for
+from flask.json.provider import DefaultJSONProvider
 from dotenv import load_dotenv
 
 # ── Bootstrap ──────────────────────────────────────────────────────────────
@@ -23,6 +31,19 @@ load_dotenv(os.path.join(BASE_DIR, '.env'))
 app = Flask(__name__, template_folder=os.path.join(BASE_DIR, 'templates'))
 
 
+class OrjsonProvider(DefaultJSONProvider):
+    """Route jsonify(), request.get_json() and |tojson through orjson."""
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+
+app.json = OrjsonProvider(app)
+
+
 @app.after_request
 def no_cache(response):
     """Prevent browsers and proxies from caching dynamic content."""
@@ -41,7 +62,7 @@ log = logging.getLogger(__name__)
 logging.getLogger('werkzeug').setLevel(logging.ERROR)   # silence Werkzeug access/startup noise
 
 SETTINGS_FILE     = os.path.join(BASE_DIR, 'data', 'settings.json')
-ORDERS_FILE       = os.path.join(BASE_DIR, 'data', 'orders.json')
+ORDERS_FILE       = os.path.join(BASE_DIR, 'data', 'orders.jsonl')
 OPENALGO_URL      = os.getenv('OPENALGO_URL',      'http://localhost:5000/api/v1').rstrip('/')
 OPENALGO_API_KEY  = os.getenv('OPENALGO_API_KEY',  '')
 MARKET_STATUS_URL = os.getenv('MARKET_STATUS_URL', 'http://host.docker.internal:5002/api/status')
@@ -71,55 +92,155 @@ DEFAULT_SETTINGS = {
 
 # ── Settings ───────────────────────────────────────────────────────────────
 
+# Parsed settings.json, re-read only when the file's mtime changes
+_settings_cache = None
+_settings_mtime = -1
+
+
 def load_settings():
+    """Settings merged over DEFAULT_SETTINGS. Returns a copy safe to mutate."""
+    global _settings_cache, _settings_mtime
     try:
-        with open(SETTINGS_FILE, 'r') as f:
-            on_disk = json.load(f)
-        merged = {}
-        for sec in ('nifty', 'banknifty', 'common', 'ui'):
-            merged[sec] = dict(DEFAULT_SETTINGS[sec])
-            merged[sec].update(on_disk.get(sec, {}))
-        return merged
-    except (FileNotFoundError, json.JSONDecodeError):
+        mtime = os.stat(SETTINGS_FILE).st_mtime_ns
+        if mtime != _settings_mtime:
+            with open(SETTINGS_FILE, 'rb') as f:
+                on_disk = orjson.loads(f.read())
+            merged = {}
+            for sec in ('nifty', 'banknifty', 'common', 'ui'):
+                merged[sec] = dict(DEFAULT_SETTINGS[sec])
+                merged[sec].update(on_disk.get(sec, {}))
+            _settings_cache, _settings_mtime = merged, mtime
+        return {k: dict(v) for k, v in _settings_cache.items()}
+    except (FileNotFoundError, orjson.JSONDecodeError):
         save_settings(DEFAULT_SETTINGS)
         return {k: dict(v) for k, v in DEFAULT_SETTINGS.items()}
 
 
+def _atomic_write_bytes(path, data):
+    """Replace path with data via a synced temp file, so readers and crashes
+    never see a half-written file."""
+    d = os.path.dirname(path)
+    os.makedirs(d, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=d, prefix='.' + os.path.basename(path))
+    try:
+        if hasattr(os, 'fchmod'):       # mkstemp creates 0600; keep files readable
+            os.fchmod(fd, 0o644)
+        os.write(fd, data)
+        os.fsync(fd)
+        os.close(fd)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.close(fd)
+        except OSError:
+            pass
+        os.unlink(tmp)
+        raise
+
+
 def save_settings(settings):
-    os.makedirs(os.path.dirname(SETTINGS_FILE), exist_ok=True)
-    with open(SETTINGS_FILE, 'w') as f:
-        json.dump(settings, f, indent=2)
+    global _settings_mtime
+    _atomic_write_bytes(SETTINGS_FILE, orjson.dumps(settings, option=orjson.OPT_INDENT_2))
+    _settings_mtime = -1    # force the next load_settings() to re-read
 
 
 # ── Order Management ────────────────────────────────────────────────────────
 
-def load_orders():
-    """Load stored order IDs. Auto-resets if orders are from a previous trading day."""
+# orders.jsonl holds a {"date": ...} header line followed by one order per
+# line. It is read once into _orders; after that reads are served from
+# memory, new orders are appended to the file, and the file is only
+# rewritten when existing entries change. Orders from a previous trading
+# day are cleared at startup and at each midnight by _rollover_orders().
+_orders      = None
+_orders_date = None     # trading day (ISO date) the stored orders belong to
+_orders_lock = threading.RLock()
+
+
+def _read_orders_file():
+    """(date, orders) from orders.jsonl; date is None if there is no file."""
+    date, orders = None, []
     try:
-        with open(ORDERS_FILE, encoding='utf-8') as fh:
-            orders = json.load(fh)
-        today = datetime.date.today().isoformat()
-        if orders:
-            oldest = min((o.get('timestamp', 0) for o in orders), default=0)
-            order_date = datetime.date.fromtimestamp(oldest).isoformat() if oldest else today
-            if order_date != today:
-                save_orders([])
-                return []
-        return orders
-    except (FileNotFoundError, json.JSONDecodeError):
-        return []
+        with open(ORDERS_FILE, 'rb') as fh:
+            for line in fh:
+                if not line.strip():
+                    continue
+                try:
+                    entry = orjson.loads(line)
+                except orjson.JSONDecodeError:
+                    continue    # torn line from an interrupted append
+                if 'order_id' in entry:
+                    orders.append(entry)
+                elif 'date' in entry:
+                    date = entry['date']
+    except FileNotFoundError:
+        pass
+    if date is None and orders:
+        # File written before the date header existed: date it by its oldest order
+        oldest = min(o.get('timestamp', 0) for o in orders)
+        date = datetime.date.fromtimestamp(oldest).isoformat() if oldest else None
+    return date, orders
+
+
+def _orders_in_memory():
+    """The live order list (caller must hold _orders_lock)."""
+    global _orders, _orders_date
+    if _orders is None:
+        _orders_date, _orders = _read_orders_file()
+    return _orders
+
+
+def load_orders():
+    """Load stored orders."""
+    with _orders_lock:
+        return [dict(o) for o in _orders_in_memory()]
 
 
 def save_orders(orders):
-    os.makedirs(os.path.dirname(ORDERS_FILE), exist_ok=True)
-    with open(ORDERS_FILE, 'w', encoding='utf-8') as fh:
-        json.dump(orders, fh, indent=2)
+    """Replace all stored orders and rewrite orders.jsonl."""
+    global _orders, _orders_date
+    with _orders_lock:
+        _orders = [dict(o) for o in orders]
+        if not (_orders and _orders_date):
+            _orders_date = datetime.date.today().isoformat()
+        _atomic_write_bytes(ORDERS_FILE, b''.join(
+            [orjson.dumps({"date": _orders_date}) + b'\n',
+             *(orjson.dumps(o) + b'\n' for o in _orders)]))
+    _orders_changed()
+
+
+def _rollover_orders():
+    """Clear orders from a previous trading day, then re-arm for next midnight."""
+    today = datetime.date.today()
+    with _orders_lock:
+        _orders_in_memory()
+        if _orders_date is not None and _orders_date != today.isoformat():
+            save_orders([])
+    midnight = datetime.datetime.combine(today + datetime.timedelta(days=1),
+                                         datetime.time())
+    timer = threading.Timer((midnight - datetime.datetime.now()).total_seconds() + 1,
+                            _rollover_orders)
+    timer.daemon = True
+    timer.start()
+
+
+def _set_order_statuses(statuses):
+    """Apply {order_id: status} to stored orders; rewrite the file if any changed."""
+    with _orders_lock:
+        orders  = _orders_in_memory()
+        changed = False
+        for o in orders:
+            status = statuses.get(o.get('order_id'))
+            if status is not None and o.get('status') != status:
+                o['status'] = status
+                changed = True
+        if changed:
+            save_orders(orders)
+        return changed
 
 
 def store_order(order_id, symbol=None, action=None, quantity=None,
                 price=None, pricetype=None):
-    orders = load_orders()
-    orders.append({
+    order = {
         "order_id":  order_id,
         "timestamp": int(time.time()),
         "symbol":    symbol,
@@ -128,33 +249,59 @@ def store_order(order_id, symbol=None, action=None, quantity=None,
         "price":     price,
         "pricetype": pricetype,
         "status":    "pending"
-    })
-    save_orders(orders)
+    }
+    global _orders_date
+    with _orders_lock:
+        _orders_in_memory().append(order)
+        line = orjson.dumps(order) + b'\n'
+        if _orders_date is None:    # new file: start it with the date header
+            _orders_date = datetime.date.today().isoformat()
+            line = orjson.dumps({"date": _orders_date}) + b'\n' + line
+        os.makedirs(os.path.dirname(ORDERS_FILE), exist_ok=True)
+        with open(ORDERS_FILE, 'ab') as fh:
+            fh.write(line)
+            fh.flush()
+            os.fsync(fh.fileno())
+    _orders_changed()
+
+
+def dismiss_order(order_id):
+    """Drop an order from local tracking."""
+    with _orders_lock:
+        save_orders([o for o in _orders_in_memory() if o.get('order_id') != order_id])
 
 
 def get_pending_orders():
     return [o for o in load_orders() if o.get('status') == 'pending']
 
 
+# Broker statuses after which an order is no longer pending
+_TERMINAL = frozenset({'COMPLETE', 'REJECTED', 'CANCELLED', 'CLOSED'})
+
+
 def sync_order_status():
-    """Check OpenAlgo orderbook and update local order statuses."""
-    result = api_post('orderbook', {"apikey": OPENALGO_API_KEY})
+    """Check OpenAlgo orderbook and update local order statuses.
+
+    The positionbook is fetched alongside, since a fill changes positions too
+    and the UI refreshes them as soon as an order leaves the pending list.
+    """
+    gen = _positions_gen
+    result, positionbook = api_post_batch([
+        ('orderbook',    {"apikey": OPENALGO_API_KEY}),
+        ('positionbook', {"apikey": OPENALGO_API_KEY}),
+    ])
+    _cache_positions(positionbook, gen)
     orderbook_map = {}
     if result.get('status') == 'success':
         orders_data = result.get('data', {})
         orders_list = orders_data.get('orders', []) if isinstance(orders_data, dict) else orders_data
-        for o in orders_list:
-            orderbook_map[o.get('orderid')] = o.get('status')
-    orders = load_orders()
-    updated = False
-    for local in orders:
-        if local.get('status') == 'pending':
-            broker_status = orderbook_map.get(local.get('order_id'))
-            if broker_status in ['COMPLETE', 'REJECTED', 'CANCELLED', 'CLOSED']:
-                local['status'] = broker_status.lower()
-                updated = True
-    if updated:
-        save_orders(orders)
+        orderbook_map = {o['orderid']: o.get('status') for o in orders_list if 'orderid' in o}
+    statuses = {}
+    for local in load_orders():
+        if (local['status'] == 'pending'
+                and (broker_status := orderbook_map.get(local['order_id'])) in _TERMINAL):
+            statuses[local['order_id']] = broker_status.lower()
+    updated = _set_order_statuses(statuses) if statuses else False
     return {"status": "success", "updated": updated}
 
 
@@ -165,43 +312,228 @@ def cancel_order_by_id(order_id):
         "strategy":  "trading_app"
     })
     if result.get('status') == 'success':
-        orders = load_orders()
-        for o in orders:
-            if o.get('order_id') == order_id:
-                o['status'] = 'cancelled'
-        save_orders(orders)
+        _set_order_statuses({order_id: 'cancelled'})
     return result
 
 
+# ── Order status streaming ─────────────────────────────────────────────────
+# One background thread polls /orderbook while any order is pending, so the
+# upstream poll rate no longer depends on how many browser tabs are open.
+# Changes to the pending list are pushed to /api/orders/stream subscribers.
+
+ORDER_POLL_INTERVAL = 2    # seconds between /orderbook polls while orders pend
+SSE_KEEPALIVE       = 10   # seconds between keep-alive comments on idle streams
+
+_order_subscribers = set()               # one queue.Queue per stream client
+_subscribers_lock  = threading.Lock()
+_orders_wakeup     = threading.Event()   # set whenever stored orders change
+_poller_started    = False
+
+
+def _orders_changed():
+    """Wake the poller and push the current pending list to every subscriber."""
+    _orders_wakeup.set()
+    if not _order_subscribers:
+        return
+    payload = orjson.dumps(get_pending_orders())
+    with _subscribers_lock:
+        subscribers = list(_order_subscribers)
+    for q in subscribers:
+        q.put(payload)
+
+
+def _poll_orderbook():
+    while True:
+        if not get_pending_orders():
+            _orders_wakeup.wait()
+            _orders_wakeup.clear()
+            continue
+        time.sleep(ORDER_POLL_INTERVAL)
+        try:
+            sync_order_status()
+        except Exception as e:
+            log.warning("Order status sync failed: %s", e)
+
+
+def start_order_poller():
+    """Start the background /orderbook poller and daily order reset (idempotent)."""
+    global _poller_started
+    if _poller_started:
+        return
+    _poller_started = True
+    _rollover_orders()
+    threading.Thread(target=_poll_orderbook, name='orderbook-poller',
+                     daemon=True).start()
+
+
 # ── OpenAlgo API ────────────────────────────────────────────────────────────
 
+# Keep-alive connections to OpenAlgo, shared across Flask's request threads.
+# The URL is parsed once here; each call reuses an idle connection if any.
+_OPENALGO      = urlparse(OPENALGO_URL)
+_OPENALGO_CONN = (http.client.HTTPSConnection if _OPENALGO.scheme == 'https'
+                  else http.client.HTTPConnection)
+_API_POOL_MAX  = 8
+_api_pool      = []
+_api_pool_lock = threading.Lock()
+
+
+# Read-only endpoints, safe to resend if the connection drops mid-request
+_IDEMPOTENT = frozenset({'positionbook', 'orderbook', 'ping'})
+
+
+def _api_pool_get():
+    """Take a live idle connection to OpenAlgo, or open a new one.
+
+    An idle socket that polls readable has been closed by OpenAlgo (EOF), and
+    is discarded rather than used for a request that then can't be resent.
+    """
+    while True:
+        with _api_pool_lock:
+            if not _api_pool:
+                break
+            conn = _api_pool.pop()
+        if conn.sock is None or not select.select([conn.sock], [], [], 0)[0]:
+            return conn
+        conn.close()
+    return _OPENALGO_CONN(_OPENALGO.hostname, _OPENALGO.port, timeout=10)
+
+
+def _api_request(path, body, idempotent=False):
+    """POST `body` to `path` on a pooled connection. Returns (status, reason, bytes).
+
+    A reused socket may have been closed by OpenAlgo while idle, so a failure
+    on one is retried once on a fresh connection. Once the body has been sent
+    that is done only for `idempotent` requests: OpenAlgo may already have
+    placed or cancelled an order before the connection dropped.
+    """
+    conn = _api_pool_get()
+    headers = {'Content-Type': 'application/json'}
+    for attempt in (1, 2):
+        reused = conn.sock is not None
+        sent   = False
+        try:
+            conn.request('POST', path, body=body, headers=headers)
+            sent = True
+            resp = conn.getresponse()
+            raw  = resp.read()
+            break
+        except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+            conn.close()
+            if not reused or attempt == 2 or (sent and not idempotent):
+                raise
+        except Exception:
+            conn.close()
+            raise
+    with _api_pool_lock:
+        if len(_api_pool) < _API_POOL_MAX:
+            _api_pool.append(conn)
+            conn = None
+    if conn is not None:
+        conn.close()
+    return resp.status, resp.reason, raw
+
+
 def api_post(endpoint, data):
     """POST to OpenAlgo REST API. Returns parsed JSON dict."""
-    url = f"{OPENALGO_URL}/{endpoint}"
     try:
-        body = json.dumps(data).encode('utf-8')
-        req  = urllib.request.Request(url, data=body,
-                                      headers={'Content-Type': 'application/json'})
-        with urllib.request.urlopen(req, timeout=10) as resp:
-            text = resp.read().decode('utf-8')
-            return json.loads(text) if text.strip() else \
-                   {"status": "error", "message": "Empty response from API"}
-    except urllib.error.HTTPError as e:
-        try:
-            return json.loads(e.read().decode('utf-8'))
-        except Exception:
-            return {"status": "error", "message": f"HTTP {e.code}: {e.reason}"}
+        body = orjson.dumps(data)
+        status, reason, raw = _api_request(f"{_OPENALGO.path}/{endpoint}", body,
+                                           endpoint in _IDEMPOTENT)
+        if status >= 400:
+            try:
+                return orjson.loads(raw)
+            except Exception:
+                return {"status": "error", "message": f"HTTP {status}: {reason}"}
+        return orjson.loads(raw) if raw.strip() else \
+               {"status": "error", "message": "Empty response from API"}
     except Exception as e:
         return {"status": "error", "message": str(e)}
 
 
+_api_executor = ThreadPoolExecutor(max_workers=_API_POOL_MAX,
+                                   thread_name_prefix='openalgo')
+
+
+def api_post_batch(calls):
+    """Run several api_post calls concurrently over the connection pool.
+
+    `calls` is a list of (endpoint, data) pairs; results come back in order.
+    """
+    if len(calls) < 2:
+        return [api_post(endpoint, data) for endpoint, data in calls]
+    return list(_api_executor.map(lambda call: api_post(*call), calls))
+
+
+# Short-lived positionbook cache: a burst of orders (e.g. closing several legs
+# back to back) shares one /positionbook round trip instead of one per order.
+# The {symbol: qty} map is built once per fetch so lookups are O(1).
+# _positions_gen is bumped on every invalidation; a positionbook is cached
+# only if the generation read before fetching it is still current, so one
+# requested before an order never passes for fresh after it.
+POSITIONS_TTL    = 0.5   # seconds
+_positions_cache = {'t': 0.0, 'data': [], 'map': {}}
+_positions_gen   = 0
+_positions_lock  = threading.Lock()
+
+
+def _fetch_positions():
+    """(positions, {symbol: qty}) — from the cache while it is fresh."""
+    with _positions_lock:
+        if time.monotonic() - _positions_cache['t'] < POSITIONS_TTL:
+            return _positions_cache['data'], _positions_cache['map']
+        gen = _positions_gen
+    return _cache_positions(api_post('positionbook', {"apikey": OPENALGO_API_KEY}), gen)
+
+
+def _qty(p):
+    """Net quantity of a positionbook row; OpenAlgo sends it as a numeric string."""
+    v = p.get('quantity', 0)
+    if isinstance(v, int):
+        return v
+    if isinstance(v, str) and v.lstrip('-').isdigit():
+        return int(v)
+    return int(float(v))
+
+
+def _cache_positions(result, gen):
+    """Store a /positionbook response in the cache; returns (positions, map).
+
+    `gen` is the _positions_gen value read before the request; the response is
+    not stored if the cache was invalidated since.
+    """
+    if result.get('status') != 'success':
+        return [], {}
+    positions, qty_map = [], {}
+    for p in result.get('data', []):
+        qty = _qty(p)
+        if qty:
+            positions.append(p)
+            qty_map[p.get('symbol')] = qty
+    with _positions_lock:
+        if gen == _positions_gen:
+            _positions_cache['t']    = time.monotonic()
+            _positions_cache['data'] = positions
+            _positions_cache['map']  = qty_map
+    return positions, qty_map
+
+
 def get_positions():
-    """Return non-zero positions from OpenAlgo positionbook."""
-    result = api_post('positionbook', {"apikey": OPENALGO_API_KEY})
-    if result.get('status') == 'success':
-        return [p for p in result.get('data', [])
-                if int(float(p.get('quantity', 0))) != 0]
-    return []
+    """Return non-zero positions from OpenAlgo positionbook (cached briefly)."""
+    return list(_fetch_positions()[0])
+
+
+def get_position_map():
+    """Net qty per symbol for all open positions (cached briefly)."""
+    return dict(_fetch_positions()[1])
+
+
+def _invalidate_positions():
+    """Force the next positions lookup to refetch, e.g. after an order."""
+    global _positions_gen
+    with _positions_lock:
+        _positions_gen += 1
+        _positions_cache['t'] = 0.0
 
 
 def ping_openalgo():
@@ -210,25 +542,28 @@ def ping_openalgo():
     return result.get('status') == 'success'
 
 
-def get_position_qty(symbol):
-    """Net qty for a symbol: positive=long, negative=short, 0=flat."""
-    for pos in get_positions():
-        if pos.get('symbol') == symbol:
-            return int(float(pos.get('quantity', 0)))
-    return 0
+def get_position_qty(symbol, position_map=None):
+    """Net qty for a symbol: positive=long, negative=short, 0=flat.
+
+    Pass `position_map` (from get_position_map) to reuse one fetch for a batch.
+    """
+    if position_map is None:
+        position_map = get_position_map()
+    return position_map.get(symbol, 0)
 
 
 def place_smart_order(symbol, target_position, pricetype='MARKET',
-                      price=None, trigger_price=None):
+                      price=None, trigger_price=None, position_map=None):
     """
     Place a position-aware order via /placesmartorder.
     target_position: desired net qty (positive=long, negative=short, 0=close)
+    position_map: optional get_position_map() result to reuse across a batch
     """
     settings = load_settings()
     product  = settings['common'].get('product', 'MIS')
 
     if target_position == 0:
-        current = get_position_qty(symbol)
+        current = get_position_qty(symbol, position_map)
         if current == 0:
             return {"status": "success", "message": "Already flat — no action needed"}
         qty    = abs(current)
@@ -252,6 +587,9 @@ def place_smart_order(symbol, target_position, pricetype='MARKET',
         "disclosed_quantity": "0"
     }
     result = api_post('placesmartorder', data)
+    if result.get('status') == 'success':
+        # Never answer a follow-up close for this symbol from a stale quantity
+        _invalidate_positions()
     # Store order ID for limit/SL orders (so they can be tracked and cancelled)
     if result.get('status') == 'success' and pricetype != 'MARKET':
         order_id = result.get('orderid')
@@ -260,6 +598,35 @@ def place_smart_order(symbol, target_position, pricetype='MARKET',
     return result
 
 
+def _upper(v):
+    return v.strip().upper()
+
+
+def _strip(v):
+    return v.strip()
+
+
+# Settings form: (section, key, form field, converter, default if optional)
+_SETTINGS_FORM = (
+    ('nifty',     'expiry',        'nifty_expiry',        _upper, None),
+    ('nifty',     'strike_ce',     'nifty_strike_ce',     _strip, None),
+    ('nifty',     'strike_pe',     'nifty_strike_pe',     _strip, None),
+    ('nifty',     'lot_size',      'nifty_lot_size',      int,    None),
+    ('banknifty', 'expiry',        'banknifty_expiry',    _upper, None),
+    ('banknifty', 'strike_ce',     'banknifty_strike_ce', _strip, None),
+    ('banknifty', 'strike_pe',     'banknifty_strike_pe', _strip, None),
+    ('banknifty', 'lot_size',      'banknifty_lot_size',  int,    None),
+    ('common',    'quantity_lots', 'quantity_lots',       int,    None),
+    ('common',    'product',       'product',             str,    None),
+    ('ui',        'cards_layout',  'cards_layout',        str,    'horizontal'),
+)
+
+# (instrument, 'ce'|'pe') -> converter for the strikes /api/update_strike may move
+_STRIKE_FIELDS = {(sec, key[-2:]): convert
+                  for sec, key, _, convert, _ in _SETTINGS_FORM
+                  if key.startswith('strike_')}
+
+
 def build_symbols(settings):
     n = settings['nifty']
     b = settings['banknifty']
@@ -271,20 +638,36 @@ def build_symbols(settings):
     }
 
 
+def trading_layout(settings):
+    """(cards, lot_sizes, symbols) for the trading page. Treat as read-only."""
+    n, b = settings['nifty'], settings['banknifty']
+    return _trading_layout(n['expiry'], n['strike_ce'], n['strike_pe'], n['lot_size'],
+                           b['expiry'], b['strike_ce'], b['strike_pe'], b['lot_size'])
+
+
+# Keyed on the settings values the page uses, so it is rebuilt once per
+# settings change and always matches the settings it was given
+@functools.lru_cache(maxsize=4)
+def _trading_layout(n_expiry, n_ce, n_pe, n_lot, b_expiry, b_ce, b_pe, b_lot):
+    syms  = build_symbols({
+        'nifty':     {'expiry': n_expiry, 'strike_ce': n_ce, 'strike_pe': n_pe},
+        'banknifty': {'expiry': b_expiry, 'strike_ce': b_ce, 'strike_pe': b_pe},
+    })
+    cards = (
+        ('NIFTY CE',  syms['nifty_ce'],     n_lot),
+        ('NIFTY PE',  syms['nifty_pe'],     n_lot),
+        ('BNIFTY CE', syms['banknifty_ce'], b_lot),
+        ('BNIFTY PE', syms['banknifty_pe'], b_lot),
+    )
+    return (cards, {sym: ls for _, sym, ls in cards}, [sym for _, sym, _ in cards])
+
+
 # ── Routes ──────────────────────────────────────────────────────────────────
 
 @app.route('/')
 def index():
     settings = load_settings()
-    syms     = build_symbols(settings)
-    cards = [
-        ('NIFTY CE',  syms['nifty_ce'],     settings['nifty']['lot_size']),
-        ('NIFTY PE',  syms['nifty_pe'],     settings['nifty']['lot_size']),
-        ('BNIFTY CE', syms['banknifty_ce'], settings['banknifty']['lot_size']),
-        ('BNIFTY PE', syms['banknifty_pe'], settings['banknifty']['lot_size']),
-    ]
-    lot_sizes = {sym: ls for _, sym, ls in cards}
-    symbols   = [sym for _, sym, _ in cards]
+    cards, lot_sizes, symbols = trading_layout(settings)
     return render_template('trading.html',
                            cards=cards,
                            lot_sizes=lot_sizes,
@@ -302,27 +685,10 @@ def settings_page():
 
 @app.route('/settings', methods=['POST'])
 def update_settings():
-    settings = {
-        "nifty": {
-            "expiry":    request.form['nifty_expiry'].strip().upper(),
-            "strike_ce": request.form['nifty_strike_ce'].strip(),
-            "strike_pe": request.form['nifty_strike_pe'].strip(),
-            "lot_size":  int(request.form['nifty_lot_size']),
-        },
-        "banknifty": {
-            "expiry":    request.form['banknifty_expiry'].strip().upper(),
-            "strike_ce": request.form['banknifty_strike_ce'].strip(),
-            "strike_pe": request.form['banknifty_strike_pe'].strip(),
-            "lot_size":  int(request.form['banknifty_lot_size']),
-        },
-        "common": {
-            "quantity_lots": int(request.form['quantity_lots']),
-            "product":       request.form['product'],
-        },
-        "ui": {
-            "cards_layout": request.form.get('cards_layout', 'horizontal'),
-        }
-    }
+    settings = {sec: {} for sec in DEFAULT_SETTINGS}
+    for sec, key, field, convert, default in _SETTINGS_FORM:
+        raw = request.form[field] if default is None else request.form.get(field, default)
+        settings[sec][key] = convert(raw)
     save_settings(settings)
     return redirect(url_for('index'))
 
@@ -346,7 +712,28 @@ def api_pending_orders():
 
 @app.route('/api/sync_order_status', methods=['POST'])
 def api_sync_order_status():
-    return jsonify(sync_order_status())
+    """Statuses are kept current by the background poller; report them."""
+    return jsonify({"status": "success", "pending": get_pending_orders()})
+
+
+@app.route('/api/orders/stream')
+def api_orders_stream():
+    """Server-Sent Events: the pending-order list, pushed whenever it changes."""
+    def stream():
+        q = queue.Queue()
+        with _subscribers_lock:
+            _order_subscribers.add(q)
+        try:
+            yield b'data: ' + orjson.dumps(get_pending_orders()) + b'\n\n'
+            while True:
+                try:
+                    yield b'data: ' + q.get(timeout=SSE_KEEPALIVE) + b'\n\n'
+                except queue.Empty:
+                    yield b': keep-alive\n\n'
+        finally:
+            with _subscribers_lock:
+                _order_subscribers.discard(q)
+    return Response(stream(), mimetype='text/event-stream')
 
 
 @app.route('/api/dismiss_order', methods=['POST'])
@@ -354,10 +741,7 @@ def api_dismiss_order():
     """Remove a stuck order from local tracking without touching the broker."""
     try:
         data = request.get_json(force=True)
-        order_id = data['order_id']
-        orders = load_orders()
-        orders = [o for o in orders if o.get('order_id') != order_id]
-        save_orders(orders)
+        dismiss_order(data['order_id'])
         return jsonify({"status": "success"})
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
@@ -381,24 +765,18 @@ def api_update_strike():
         delta       = int(data.get('delta', 0))
         settings    = load_settings()
 
-        if instrument == 'nifty':
-            old_strike = int(settings['nifty'][f'strike_{option_type}'])
-            new_strike = old_strike + delta
-            settings['nifty'][f'strike_{option_type}'] = str(new_strike)
-            expiry     = settings['nifty']['expiry']
-            suffix     = 'CE' if option_type == 'ce' else 'PE'
-            old_symbol = f"NIFTY{expiry}{old_strike}{suffix}"
-            new_symbol = f"NIFTY{expiry}{new_strike}{suffix}"
-        elif instrument == 'banknifty':
-            old_strike = int(settings['banknifty'][f'strike_{option_type}'])
-            new_strike = old_strike + delta
-            settings['banknifty'][f'strike_{option_type}'] = str(new_strike)
-            expiry     = settings['banknifty']['expiry']
-            suffix     = 'CE' if option_type == 'ce' else 'PE'
-            old_symbol = f"BANKNIFTY{expiry}{old_strike}{suffix}"
-            new_symbol = f"BANKNIFTY{expiry}{new_strike}{suffix}"
-        else:
+        convert = _STRIKE_FIELDS.get((instrument, option_type))
+        if convert is None:
             return jsonify({"status": "error", "message": "Unknown instrument"}), 400
+        key        = f'strike_{option_type}'
+        old_strike = int(settings[instrument][key])
+        new_strike = old_strike + delta
+        settings[instrument][key] = convert(str(new_strike))
+        expiry     = settings[instrument]['expiry']
+        prefix     = instrument.upper()
+        suffix     = option_type.upper()
+        old_symbol = f"{prefix}{expiry}{old_strike}{suffix}"
+        new_symbol = f"{prefix}{expiry}{new_strike}{suffix}"
 
         save_settings(settings)
         return jsonify({
@@ -436,6 +814,7 @@ if __name__ == '__main__':
     print(f"OpenAlgo URL →  {OPENALGO_URL}")
     print(f"API key      →  {'set' if OPENALGO_API_KEY else 'NOT SET — edit .env'}")
     print(f"Settings     →  {SETTINGS_FILE}\n")
+    start_order_poller()
     app.run(host='0.0.0.0', port=port,
             debug=os.getenv('FLASK_DEBUG', 'false').lower() == 'true',
             threaded=True)
@@ -2,13 +2,24 @@
 """
 Trading App — Standalone server
 Zero external dependencies — Python 3.8+ stdlib only.
-No pip installs needed: no Flask, no python-dotenv.
+No pip installs needed: no Flask, no python-dotenv (orjson is optional).
 Port: 5003  (override with PORT env var or .env PORT=xxxx)
+Worker threads: 64  (override with HTTP_WORKERS)
 """
 
-import os, json, socketserver, urllib.request, urllib.error
+import os, json, gzip, time, select, socket, hashlib, email.utils, datetime, functools, threading, http.client, urllib.request
+from concurrent.futures import Future, ThreadPoolExecutor
 from http.server  import BaseHTTPRequestHandler, HTTPServer
-from urllib.parse import parse_qs, urlparse
+from urllib.parse import parse_qsl, urlparse
+
+# orjson is used when it happens to be installed; the stdlib is the fallback
+try:
+    import orjson
+    _dumps, _loads = orjson.dumps, orjson.loads
+except ImportError:
+    def _dumps(obj):
+        return json.dumps(obj, separators=(',', ':')).encode('utf-8')
+    _loads = json.loads
 
 # ── Bootstrap ──────────────────────────────────────────────────────────────
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -32,14 +43,20 @@ def _load_env():
 _load_env()
 
 SETTINGS_FILE    = os.path.join(BASE_DIR, 'data', 'settings.json')
-ORDERS_FILE      = os.path.join(BASE_DIR, 'data', 'orders.json')
+ORDERS_FILE      = os.path.join(BASE_DIR, 'data', 'orders.jsonl')
 OPENALGO_URL      = os.getenv('OPENALGO_URL', 'http://localhost:5000/api/v1').rstrip('/')
 OPENALGO_API_KEY  = os.getenv('OPENALGO_API_KEY', '')
 MARKET_STATUS_URL = os.getenv('MARKET_STATUS_URL', 'http://host.docker.internal:5002/api/status')
+# Each kept-alive connection holds a worker until it idles out, so this
+# leaves room for several tabs plus the PWA proxy's connection pool
+HTTP_WORKERS      = int(os.getenv('HTTP_WORKERS', 64))
+
+# Created once here so the save paths never need to check for it
+os.makedirs(os.path.join(BASE_DIR, 'data'), exist_ok=True)
 
 DEFAULT_SETTINGS = {
-    "nifty":     {"expiry": "17FEB26", "strike_ce": "25700", "strike_pe": "25600", "lot_size": 65},
-    "banknifty": {"expiry": "24FEB26", "strike_ce": "60500", "strike_pe": "60600", "lot_size": 30},
+    "nifty":     {"expiry": "17FEB26", "strike_ce": 25700, "strike_pe": 25600, "lot_size": 65},
+    "banknifty": {"expiry": "24FEB26", "strike_ce": 60500, "strike_pe": 60600, "lot_size": 30},
     "common":    {"quantity_lots": 2, "product": "MIS"},
     "ui":        {"cards_layout": "horizontal"},
 }
@@ -47,63 +64,179 @@ DEFAULT_SETTINGS = {
 
 # ── Settings ───────────────────────────────────────────────────────────────
 
+# Parsed settings.json, kept in memory and reused while the file's
+# (mtime, size) stamp is unchanged, so a hand edit is still picked up
+_settings_cache = {'stamp': None, 'value': None}
+
+
+def _settings_stamp():
+    st = os.stat(SETTINGS_FILE)
+    return st.st_mtime_ns, st.st_size
+
+
+# Numeric settings are held as ints; files written before that (or hand
+# edited) may have them as strings
+_INT_FIELDS = (('nifty', 'strike_ce'), ('nifty', 'strike_pe'), ('nifty', 'lot_size'),
+               ('banknifty', 'strike_ce'), ('banknifty', 'strike_pe'),
+               ('banknifty', 'lot_size'), ('common', 'quantity_lots'))
+
+
+def _as_int(value):
+    """int(value), or value unchanged if it isn't a number (e.g. blank)."""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return value
+
+
 def load_settings():
+    """Settings merged over DEFAULT_SETTINGS. Returns a copy safe to mutate."""
     try:
-        with open(SETTINGS_FILE, encoding='utf-8') as fh:
-            on_disk = json.load(fh)
-        merged = {}
-        for sec in ('nifty', 'banknifty', 'common', 'ui'):
-            merged[sec] = dict(DEFAULT_SETTINGS[sec])
-            merged[sec].update(on_disk.get(sec, {}))
-        return merged
-    except (FileNotFoundError, json.JSONDecodeError):
+        stamp = _settings_stamp()
+        if stamp != _settings_cache['stamp']:
+            with open(SETTINGS_FILE, 'rb') as fh:
+                on_disk = _loads(fh.read())
+            merged = {}
+            for sec in ('nifty', 'banknifty', 'common', 'ui'):
+                merged[sec] = dict(DEFAULT_SETTINGS[sec])
+                merged[sec].update(on_disk.get(sec, {}))
+            for sec, key in _INT_FIELDS:
+                merged[sec][key] = _as_int(merged[sec][key])
+            _settings_cache.update(stamp=stamp, value=merged)
+    except (FileNotFoundError, ValueError):
         save_settings(DEFAULT_SETTINGS)
-        return {k: dict(v) for k, v in DEFAULT_SETTINGS.items()}
+    return {k: dict(v) for k, v in _settings_cache['value'].items()}
+
+
+_write_lock = threading.Lock()
+
+
+def _write_file(path, data):
+    """Write bytes in a single call to a temp file, then swap that into
+    place so a crash never leaves a half-written file."""
+    tmp = path + '.tmp'
+    with _write_lock:       # handler threads would otherwise share the .tmp
+        with open(tmp, 'wb') as fh:
+            fh.write(data)
+        os.replace(tmp, path)
+
+
+def _write_json(path, obj):
+    _write_file(path, json.dumps(obj, indent=2).encode('utf-8'))
 
 
 def save_settings(s):
-    os.makedirs(os.path.dirname(SETTINGS_FILE), exist_ok=True)
-    with open(SETTINGS_FILE, 'w', encoding='utf-8') as fh:
-        json.dump(s, fh, indent=2)
+    _write_json(SETTINGS_FILE, s)
+    _settings_cache.update(stamp=_settings_stamp(),
+                           value={k: dict(v) for k, v in s.items()})
 
 
 # ── Order Management ─────────────────────────────────────────────────────
 
+# orders.jsonl starts with a {"date": ...} header naming the trading day,
+# as server.py writes it. After it the file is append-only: a full record
+# per new order, then small {"order_id", "status"} records as statuses
+# change. Reading folds later records over earlier ones. The file is read
+# once into _orders_cache and rewritten compactly by save_orders() once
+# deltas outnumber the orders. Handler threads share them, so every access
+# holds _orders_lock.
+ORDERS_COMPACT_AT = 64      # on-disk records before compaction is considered
+_orders_cache   = None
+_orders_date    = None      # trading day (ISO date) the stored orders belong to
+_orders_records = 0         # order records currently in orders.jsonl
+_orders_lock    = threading.RLock()
+
+
+def _read_orders_file():
+    """(date, orders, record count) folded from orders.jsonl."""
+    date, folded, records = None, {}, 0
+    try:
+        with open(ORDERS_FILE, 'rb') as fh:
+            for line in fh:
+                try:
+                    rec = _loads(line)
+                except ValueError:
+                    continue    # blank or torn line from an interrupted append
+                if 'order_id' not in rec:
+                    date = rec.get('date', date)
+                    continue
+                records += 1
+                if rec['order_id'] in folded:
+                    folded[rec['order_id']].update(rec)
+                else:
+                    folded[rec['order_id']] = rec
+    except FileNotFoundError:
+        pass
+    if date is None:
+        # File written before the date header existed: date it by its oldest
+        # order. A status record whose order line was lost has no timestamp.
+        oldest = min((o['timestamp'] for o in folded.values() if o.get('timestamp')),
+                     default=None)
+        date = datetime.date.fromtimestamp(oldest).isoformat() if oldest else None
+    return date, list(folded.values()), records
+
+
+def _jsonl(records):
+    """Encode records as JSON lines with a single join."""
+    return b'\n'.join(map(_dumps, records)) + b'\n' if records else b''
+
+
+def _append_orders(records):
+    """Append records to orders.jsonl, compacting it once deltas pile up.
+    Caller holds _orders_lock."""
+    global _orders_records
+    if _orders_date is None:
+        save_orders(_orders_cache)  # no header yet: write one with the orders
+        return
+    with open(ORDERS_FILE, 'ab') as fh:
+        fh.write(_jsonl(records))
+    _orders_records += len(records)
+    if _orders_records > ORDERS_COMPACT_AT and _orders_records > 2 * len(_orders_cache):
+        save_orders(_orders_cache)
+
+
 def load_orders():
     """Load stored order IDs. Auto-resets if orders are from a previous trading day."""
-    try:
-        with open(ORDERS_FILE, encoding='utf-8') as fh:
-            orders = json.load(fh)
-        # Reset if any orders exist from a previous day
-        today = __import__('datetime').date.today().isoformat()
-        if orders:
-            import datetime
-            oldest = min(
-                (o.get('timestamp', 0) for o in orders),
-                default=0
-            )
-            order_date = datetime.date.fromtimestamp(oldest).isoformat() if oldest else today
-            if order_date != today:
-                save_orders([])
-                return []
-        return orders
-    except (FileNotFoundError, json.JSONDecodeError):
-        return []
+    global _orders_cache, _orders_date, _orders_records
+    with _orders_lock:
+        if _orders_cache is None:
+            _orders_date, _orders_cache, _orders_records = _read_orders_file()
+        if _orders_date is not None and _orders_date != datetime.date.today().isoformat():
+            save_orders([])
+        return [dict(o) for o in _orders_cache]
 
 
 def save_orders(orders):
-    """Save order IDs to file."""
-    os.makedirs(os.path.dirname(ORDERS_FILE), exist_ok=True)
-    with open(ORDERS_FILE, 'w', encoding='utf-8') as fh:
-        json.dump(orders, fh, indent=2)
+    """Rewrite orders.jsonl as the date header plus one full record per order."""
+    global _orders_cache, _orders_date, _orders_records
+    with _orders_lock:
+        _orders_cache   = [dict(o) for o in orders]
+        _orders_records = len(_orders_cache)
+        if not (_orders_cache and _orders_date):
+            _orders_date = datetime.date.today().isoformat()
+        _write_file(ORDERS_FILE, _jsonl([{"date": _orders_date}] + _orders_cache))
+
+
+def _set_order_statuses(statuses):
+    """Apply {order_id: status}, appending a delta record for each change."""
+    with _orders_lock:
+        load_orders()
+        deltas = []
+        for o in _orders_cache:
+            status = statuses.get(o.get('order_id'))
+            if status is not None and o.get('status') != status:
+                o['status'] = status
+                deltas.append({"order_id": o['order_id'], "status": status})
+        if deltas:
+            _append_orders(deltas)
+        return bool(deltas)
 
 
 def store_order(order_id, symbol=None, action=None, quantity=None, price=None, pricetype=None):
     """Store a new order ID with metadata."""
-    orders = load_orders()
     order_data = {
         "order_id": order_id,
-        "timestamp": int(__import__('time').time()),
+        "timestamp": int(time.time()),
         "symbol": symbol,
         "action": action,
         "quantity": quantity,
@@ -111,8 +244,10 @@ def store_order(order_id, symbol=None, action=None, quantity=None, price=None, p
         "pricetype": pricetype,
         "status": "pending"
     }
-    orders.append(order_data)
-    save_orders(orders)
+    with _orders_lock:
+        load_orders()
+        _orders_cache.append(order_data)
+        _append_orders([order_data])
 
 
 def get_pending_orders():
@@ -120,9 +255,20 @@ def get_pending_orders():
     return [o for o in load_orders() if o.get("status") == "pending"]
 
 
-def sync_order_status():
-    """Check OpenAlgo orderbook and update local order statuses."""
-    result = api_post('orderbook', {"apikey": OPENALGO_API_KEY})
+# Broker statuses after which an order is no longer pending
+_TERMINAL = frozenset({'COMPLETE', 'REJECTED', 'CANCELLED', 'CLOSED'})
+
+
+def sync_order_status(result=None):
+    """Check OpenAlgo orderbook and update local order statuses.
+
+    `result` is an already-fetched /orderbook response, if the caller has one.
+    """
+    pending = get_pending_orders()
+    if not pending:
+        return {"status": "success", "updated": False}
+    if result is None:
+        result = api_post('orderbook', {"apikey": OPENALGO_API_KEY})
     orderbook_orders = {}
     
     if result.get('status') == 'success':
@@ -134,20 +280,14 @@ def sync_order_status():
         for order in orders_list:
             orderbook_orders[order.get('orderid')] = order.get('status')
     
-    orders = load_orders()
-    updated = False
+    statuses = {}
     
-    for local_order in orders:
-        if local_order.get('status') == 'pending':
-            order_id = local_order.get('order_id')
-            if order_id in orderbook_orders:
-                broker_status = orderbook_orders[order_id]
-                if broker_status in ['COMPLETE', 'REJECTED', 'CANCELLED', 'CLOSED']:
-                    local_order['status'] = broker_status.lower()
-                    updated = True
+    for local_order in pending:
+        broker_status = orderbook_orders.get(local_order['order_id'])
+        if broker_status in _TERMINAL:
+            statuses[local_order['order_id']] = broker_status.lower()
     
-    if updated:
-        save_orders(orders)
+    updated = _set_order_statuses(statuses) if statuses else False
     
     return {"status": "success", "updated": updated}
 
@@ -162,50 +302,237 @@ def cancel_order_by_id(order_id):
     
     # Update order status in local storage
     if result.get('status') == 'success':
-        orders = load_orders()
-        for order in orders:
-            if order.get("order_id") == order_id:
-                order["status"] = "cancelled"
-        save_orders(orders)
+        _set_order_statuses({order_id: "cancelled"})
+        _invalidate_positions()
     
     return result
 
 
 # ── OpenAlgo API ─────────────────────────────────────────────────────────
 
+# Keep-alive connections to OpenAlgo, shared by the handler threads.
+# The URL is parsed once here; each call reuses an idle connection if any.
+_OPENALGO      = urlparse(OPENALGO_URL)
+_OPENALGO_CONN = (http.client.HTTPSConnection if _OPENALGO.scheme == 'https'
+                  else http.client.HTTPConnection)
+_API_POOL_MAX  = 8
+_api_pool      = []
+_api_pool_lock = threading.Lock()
+
+
+# Read-only endpoints, safe to resend if the connection drops mid-request
+_IDEMPOTENT = frozenset({'positionbook', 'orderbook', 'ping'})
+
+
+def _api_pool_get():
+    """Take a live idle connection to OpenAlgo, or open a new one.
+
+    An idle socket that polls readable has been closed by OpenAlgo (EOF), and
+    is discarded rather than used for a request that then can't be resent.
+    """
+    while True:
+        with _api_pool_lock:
+            if not _api_pool:
+                break
+            conn = _api_pool.pop()
+        if conn.sock is None or not select.select([conn.sock], [], [], 0)[0]:
+            return conn
+        conn.close()
+    return _OPENALGO_CONN(_OPENALGO.hostname, _OPENALGO.port, timeout=10)
+
+
+def _api_request(path, body, idempotent=False):
+    """POST `body` to `path` on a pooled connection. Returns (status, reason, bytes).
+
+    A reused socket may have been closed by OpenAlgo while idle, so a failure
+    on one is retried once on a fresh connection. Once the body has been sent
+    that is done only for `idempotent` requests: OpenAlgo may already have
+    placed or cancelled an order before the connection dropped.
+    """
+    conn = _api_pool_get()
+    headers = {'Content-Type': 'application/json'}
+    for attempt in (1, 2):
+        reused = conn.sock is not None
+        sent   = False
+        try:
+            conn.request('POST', path, body=body, headers=headers)
+            sent = True
+            resp = conn.getresponse()
+            raw  = resp.read()
+            break
+        except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+            conn.close()
+            if not reused or attempt == 2 or (sent and not idempotent):
+                raise
+        except Exception:
+            conn.close()
+            raise
+    with _api_pool_lock:
+        if len(_api_pool) < _API_POOL_MAX:
+            _api_pool.append(conn)
+            conn = None
+    if conn is not None:
+        conn.close()
+    return resp.status, resp.reason, raw
+
+
 def api_post(endpoint, data):
-    url  = f"{OPENALGO_URL}/{endpoint}"
-    body = json.dumps(data).encode('utf-8')
-    req  = urllib.request.Request(url, data=body,
-                                  headers={'Content-Type': 'application/json'})
+    body = _dumps(data)
     try:
-        with urllib.request.urlopen(req, timeout=10) as resp:
-            text = resp.read().decode('utf-8')
-            return json.loads(text) if text.strip() else \
-                   {"status": "error", "message": "Empty response from API"}
-    except urllib.error.HTTPError as e:
-        try:    return json.loads(e.read().decode('utf-8'))
-        except: return {"status": "error", "message": f"HTTP {e.code}: {e.reason}"}
+        status, reason, raw = _api_request(f"{_OPENALGO.path}/{endpoint}", body,
+                                           endpoint in _IDEMPOTENT)
+        if status >= 400:
+            try:    return _loads(raw)
+            except: return {"status": "error", "message": f"HTTP {status}: {reason}"}
+        return _loads(raw) if raw.strip() else \
+               {"status": "error", "message": "Empty response from API"}
     except Exception as exc:
         return {"status": "error", "message": str(exc)}
 
 
+_api_executor = ThreadPoolExecutor(max_workers=_API_POOL_MAX,
+                                   thread_name_prefix='openalgo')
+
+
+def api_post_batch(calls):
+    """Run several api_post calls concurrently over the connection pool.
+
+    `calls` is a list of (endpoint, data) pairs; results come back in order.
+    """
+    if len(calls) < 2:
+        return [api_post(endpoint, data) for endpoint, data in calls]
+    return list(_api_executor.map(lambda call: api_post(*call), calls))
+
+
+# UI polls from several tabs (and the PWA) hit the same endpoints at
+# once. A poll endpoint wrapped in _single_flight makes one upstream
+# call for all of them: callers that arrive while it is running wait for
+# its result, and the result is reused for POLL_TTL seconds.
+POLL_TTL = 0.5   # seconds
+
+
+def _single_flight(ttl):
+    def wrap(fn):
+        lock  = threading.Lock()
+        state = {'t': float('-inf'), 'value': None, 'flight': None}
+
+        @functools.wraps(fn)
+        def call():
+            with lock:
+                flight = state['flight']
+                if flight is None:
+                    if time.monotonic() - state['t'] < ttl:
+                        return state['value']
+                    flight = state['flight'] = Future()
+                    leader = True
+                else:
+                    leader = False
+            if not leader:
+                return flight.result()
+            try:
+                value = fn()
+            except BaseException as exc:
+                with lock:
+                    if state['flight'] is flight:
+                        state['flight'] = None
+                flight.set_exception(exc)
+                raise
+            with lock:
+                # Not stored if invalidate() ran meanwhile: it may predate an order
+                if state['flight'] is flight:
+                    state.update(t=time.monotonic(), value=value, flight=None)
+            flight.set_result(value)
+            return value
+
+        def invalidate():
+            with lock:
+                state.update(t=float('-inf'), flight=None)
+
+        call.invalidate = invalidate
+        return call
+    return wrap
+
+
+@_single_flight(POLL_TTL)
+def refresh():
+    """Positions and pending orders for one UI tick.
+
+    /positionbook and /orderbook are fetched concurrently; the orderbook
+    settles local order statuses before the pending list is taken. With
+    nothing pending the orderbook is not needed and is skipped.
+    """
+    calls = [('positionbook', {"apikey": OPENALGO_API_KEY})]
+    if get_pending_orders():
+        calls.append(('orderbook', {"apikey": OPENALGO_API_KEY}))
+    gen = _positions_gen
+    positionbook, *orderbook = api_post_batch(calls)
+    if orderbook:
+        sync_order_status(orderbook[0])
+    return {
+        "api_ok":  positionbook.get('status') == 'success',
+        "data":    get_positions(positionbook, gen),
+        "pending": get_pending_orders(),
+    }
+
+
+# /api/sync_order_status, shared between concurrent callers like the polls above
+poll_order_status = _single_flight(POLL_TTL)(sync_order_status)
+
+
 def get_market_status():
     req = urllib.request.Request(MARKET_STATUS_URL)
     try:
         with urllib.request.urlopen(req, timeout=5) as resp:
-            text = resp.read().decode('utf-8')
-            return json.loads(text) if text.strip() else {"status": "error", "message": "Empty response"}
+            raw = resp.read()
+            return _loads(raw) if raw.strip() else {"status": "error", "message": "Empty response"}
     except Exception as exc:
         return {"status": "error", "message": str(exc)}
 
 
-def get_positions():
-    result = api_post('positionbook', {"apikey": OPENALGO_API_KEY})
-    if result.get('status') == 'success':
-        return [p for p in result.get('data', [])
-                if int(float(p.get('quantity', 0))) != 0]
-    return []
+# Short-lived positionbook cache: a burst of close orders (several legs back
+# to back) shares one /positionbook round trip instead of one per order.
+# _positions_gen is bumped on every invalidation; a positionbook is cached
+# only if the generation read before fetching it is still current, so one
+# requested before an order never passes for fresh after it.
+POSITIONS_TTL    = 0.5   # seconds
+_positions_cache = {'t': 0.0, 'data': []}
+_positions_gen   = 0
+_positions_lock  = threading.Lock()
+
+
+def get_positions(result=None, gen=None):
+    """Non-zero positions; `result` is an already-fetched /positionbook response.
+
+    Without one, a positionbook fetched less than POSITIONS_TTL ago is reused.
+    A passed-in `result` is cached only with the `_positions_gen` value read
+    before it was requested.
+    """
+    if result is None:
+        with _positions_lock:
+            if time.monotonic() - _positions_cache['t'] < POSITIONS_TTL:
+                return list(_positions_cache['data'])
+            gen = _positions_gen
+        result = api_post('positionbook', {"apikey": OPENALGO_API_KEY})
+    if result.get('status') != 'success':
+        return []
+    positions = [p for p in result.get('data', [])
+                 if int(float(p.get('quantity', 0))) != 0]
+    with _positions_lock:
+        if gen is not None and gen == _positions_gen:
+            _positions_cache['t']    = time.monotonic()
+            _positions_cache['data'] = positions
+    return list(positions)
+
+
+def _invalidate_positions():
+    """Force the next get_positions() and UI polls to refetch, e.g. after an order."""
+    global _positions_gen
+    with _positions_lock:
+        _positions_gen += 1
+        _positions_cache['t'] = 0.0
+    refresh.invalidate()
+    positions_with_status.invalidate()
+    poll_order_status.invalidate()
 
 
 def ping_openalgo():
@@ -214,6 +541,18 @@ def ping_openalgo():
     return result.get('status') == 'success'
 
 
+@_single_flight(POLL_TTL)
+def positions_with_status():
+    """/api/positions body; /ping and /positionbook are fetched concurrently."""
+    gen = _positions_gen
+    ping, positionbook = api_post_batch([
+        ('ping',         {"apikey": OPENALGO_API_KEY}),
+        ('positionbook', {"apikey": OPENALGO_API_KEY}),
+    ])
+    return {"api_ok": ping.get('status') == 'success',
+            "data":   get_positions(positionbook, gen)}
+
+
 def get_position_qty(symbol):
     for pos in get_positions():
         if pos.get('symbol') == symbol:
@@ -221,6 +560,17 @@ def get_position_qty(symbol):
     return 0
 
 
+# Fields every /placesmartorder request shares. OpenAlgo's documented schema
+# (docs/api/order-management/placesmartorder.md) takes numeric fields as
+# strings, so quantities and prices are sent that way.
+_SMART_ORDER_BASE = {
+    "apikey":             OPENALGO_API_KEY,
+    "strategy":           "trading_app",
+    "exchange":           "NFO",
+    "disclosed_quantity": "0",
+}
+
+
 def place_smart_order(symbol, target_position, pricetype='MARKET',
                       price=None, trigger_price=None):
     settings = load_settings()
@@ -233,10 +583,8 @@ def place_smart_order(symbol, target_position, pricetype='MARKET',
     else:
         qty, action = abs(target_position), ('BUY' if target_position > 0 else 'SELL')
     result = api_post('placesmartorder', {
-        "apikey":             OPENALGO_API_KEY,
-        "strategy":           "trading_app",
+        **_SMART_ORDER_BASE,
         "symbol":             symbol,
-        "exchange":           "NFO",
         "action":             action,
         "quantity":           str(qty),
         "position_size":      str(target_position),
@@ -244,9 +592,11 @@ def place_smart_order(symbol, target_position, pricetype='MARKET',
         "pricetype":          pricetype,
         "price":              str(price) if price else "0",
         "trigger_price":      str(trigger_price) if trigger_price else "0",
-        "disclosed_quantity": "0",
     })
     
+    if result.get('status') == 'success':
+        _invalidate_positions()
+
     # Store order ID for potential cancellation (only for non-market orders)
     if result.get('status') == 'success' and pricetype != 'MARKET':
         order_id = result.get('orderid')
@@ -256,13 +606,17 @@ def place_smart_order(symbol, target_position, pricetype='MARKET',
     return result
 
 
-def build_symbols(s):
-    n, b = s['nifty'], s['banknifty']
+# Settings section -> the symbol prefix of its options
+_INSTRUMENT_PREFIX = {'nifty': 'NIFTY', 'banknifty': 'BANKNIFTY'}
+
+
+def _build_symbols(n_expiry, n_ce, n_pe, b_expiry, b_ce, b_pe):
+    """Option symbols for the given expiries and strikes."""
     return {
-        'nifty_ce':     f"NIFTY{n['expiry']}{n['strike_ce']}CE",
-        'nifty_pe':     f"NIFTY{n['expiry']}{n['strike_pe']}PE",
-        'banknifty_ce': f"BANKNIFTY{b['expiry']}{b['strike_ce']}CE",
-        'banknifty_pe': f"BANKNIFTY{b['expiry']}{b['strike_pe']}PE",
+        'nifty_ce':     f"NIFTY{n_expiry}{n_ce}CE",
+        'nifty_pe':     f"NIFTY{n_expiry}{n_pe}PE",
+        'banknifty_ce': f"BANKNIFTY{b_expiry}{b_ce}CE",
+        'banknifty_pe': f"BANKNIFTY{b_expiry}{b_pe}PE",
     }
 
 
@@ -444,13 +798,22 @@ function showStatus(msg,isErr){
   bar._t=setTimeout(()=>{bar.style.display='none';},5000);
 }
 
+// Card symbols, lot sizes and default lots, from /api/config
+let LOT_SIZES={},SYMBOLS=[],QTY_LOTS=0;
+async function loadConfig(){
+  const r=await fetch('/api/config');
+  if(!r.ok)throw new Error('HTTP '+r.status);
+  const c=await r.json();
+  LOT_SIZES=c.lot_sizes;SYMBOLS=c.symbols;QTY_LOTS=c.qty_lots;
+}
+
 async function refreshPositions(){
   try{
-    const r=await fetch('/api/positions');
+    const r=await fetch('/api/refresh');
     const res=await r.json();
     const data=res.data||[];
     renderPosBar(data);renderCards(data);
-    await refreshPendingOrders();
+    applyPendingOrders(res.pending||[]);
     document.getElementById('api-dot').style.background=res.api_ok?'#4ade80':'#f87171';
     document.getElementById('api-dot').title=res.api_ok?'OpenAlgo: connected':'OpenAlgo: unreachable';
   }catch(e){
@@ -460,40 +823,40 @@ async function refreshPositions(){
   }
 }
 
-let pendingPollInterval=null;
-
-async function syncAndRefreshPending(){
-  try{
-    await fetch('/api/sync_order_status',{method:'POST'});
-    await refreshPendingOrders();
-  }catch(e){
-    console.error('Sync failed:',e);
-  }
-}
+// While orders are pending, poll every 5s; after 5 polls with no change
+// back off to 10s until the pending list changes again.
+let pendingPollTimer=null;
+let pendingIdlePolls=0;
+let lastPendingKey='';
 
 function startPendingOrderPolling(){
-  if(pendingPollInterval)return;
-  syncAndRefreshPending();
-  pendingPollInterval=setInterval(syncAndRefreshPending,5000);
+  if(pendingPollTimer)return;
+  pendingPollTimer=setTimeout(()=>{pendingPollTimer=null;refreshPositions();},
+                              pendingIdlePolls>=5?10000:5000);
 }
 
 function stopPendingOrderPolling(){
-  if(pendingPollInterval){
-    clearInterval(pendingPollInterval);
-    pendingPollInterval=null;
+  if(pendingPollTimer){
+    clearTimeout(pendingPollTimer);
+    pendingPollTimer=null;
   }
+  pendingIdlePolls=0;
 }
 
-async function refreshPendingOrders(){
-  try{
-    const r=await fetch('/api/pending_orders');
-    const orders=await r.json();
-    renderPendingOrdersInCards(orders);
-    if(orders.length>0)startPendingOrderPolling();
-    else stopPendingOrderPolling();
-  }catch(e){
-    console.error('Failed to load pending orders:',e);
-  }
+function applyPendingOrders(orders){
+  const key=orders.map(o=>o.order_id+':'+o.status).join(',');
+  pendingIdlePolls=key===lastPendingKey?pendingIdlePolls+1:0;
+  lastPendingKey=key;
+  renderPendingOrdersInCards(orders);
+  if(orders.length>0)startPendingOrderPolling();
+  else stopPendingOrderPolling();
+}
+
+// Assign innerHTML only when the markup changed, so an unchanged poll
+// costs a string compare instead of an HTML parse and DOM rebuild
+function setHTML(el,html){
+  if(el._last===html)return;
+  el._last=html;el.innerHTML=html;
 }
 
 function renderPendingOrdersInCards(orders){
@@ -505,26 +868,26 @@ function renderPendingOrdersInCards(orders){
       container.style.display='none';return;
     }
     container.style.display='block';
-    list.innerHTML=symbolOrders.map(o=>{
+    setHTML(list,symbolOrders.map(o=>{
       const priceText=o.pricetype==='MARKET'?'MKT':(o.pricetype==='SL'?`SL@${o.price}`:o.price);
       return `<div style="background:#1e40af;color:#e2e8f0;padding:4px 8px;border-radius:4px;margin-bottom:4px;font-size:11px;display:flex;justify-content:space-between;align-items:center;">`+
       `<span>${o.action} ${o.quantity} @ ${priceText}</span>`+
       `<button onclick="cancelOrder('${o.order_id}')" style="background:#dc2626;border:none;color:white;cursor:pointer;font-size:10px;padding:2px 6px;border-radius:3px;">✕</button>`+
       `</div>`;
-    }).join('');
+    }).join(''));
   });
 }
 
 function renderPosBar(positions){
   const bar=document.getElementById('pos-bar');
   if(!positions.length){
-    bar.innerHTML='<span style="color:var(--text-muted);font-size:12px">No open positions</span>';
+    setHTML(bar,'<span style="color:var(--text-muted);font-size:12px">No open positions</span>');
     return;
   }
   const isLight=document.body.classList.contains('light');
   const pnlPos=isLight?'#16a34a':'#4ade80';
   const pnlNeg=isLight?'#dc2626':'#f87171';
-  bar.innerHTML=positions.map(p=>{
+  setHTML(bar,positions.map(p=>{
     const qty=parseInt(p.quantity||0);
     const pnl=parseFloat(p.pnl||0);
     const cls=qty>0?'chip-long':'chip-short';
@@ -532,7 +895,7 @@ function renderPosBar(positions){
     const sign=qty>0?'+':'';
     return `<span class="pos-chip ${cls}">${p.symbol} ${sign}${qty}`+
            ` <span style="color:${pCol}">&#x20B9;${pnl.toFixed(2)}</span></span>`;
-  }).join('');
+  }).join(''));
 }
 
 function renderCards(positions){
@@ -547,23 +910,27 @@ function renderCard(sym,qty){
   const btns=document.getElementById('btns_'+sym);
   if(qty===0){
     badge.textContent='FLAT';badge.className='pos-badge badge-flat';
-    btns.innerHTML='';
+    btns.style.display='none';
   }else{
     const dir=qty>0?'LONG':'SHORT';
     const lots=(Math.abs(qty)/ls).toFixed(1);
     const sign=qty>0?'+':'';
     badge.textContent=`${dir} ${lots}L (${sign}${qty})`;
     badge.className=`pos-badge badge-${dir.toLowerCase()}`;
-    const half=Math.trunc(qty/2);
-    const rev=-qty;
-    const addQ=qty+(qty>0?ls*QTY_LOTS:-(ls*QTY_LOTS));
-    btns.innerHTML=
-      `<button class="btn-half" onclick="smartOrder('${sym}',${half})">HALF</button>`+
-      `<button class="btn-rev"  onclick="smartOrder('${sym}',${rev})">REVERSE</button>`+
-      `<button class="btn-add"  onclick="smartOrder('${sym}',${addQ})">+${QTY_LOTS}L</button>`;
+    // HALF / REVERSE / +L are fixed buttons; only their targets change
+    const [half,rev,add]=btns.children;
+    half.dataset.target=Math.trunc(qty/2);
+    rev.dataset.target=-qty;
+    add.dataset.target=qty+(qty>0?ls*QTY_LOTS:-(ls*QTY_LOTS));
+    btns.style.display='';
   }
 }
 
+document.getElementById('cards-container').addEventListener('click',e=>{
+  const b=e.target.closest('button[data-target]');
+  if(b)smartOrder(b.dataset.sym,parseInt(b.dataset.target,10));
+});
+
 async function sendOrder(payload){
   const allBtns=document.querySelectorAll('button');
   allBtns.forEach(b=>b.disabled=true);
@@ -658,7 +1025,7 @@ async function cancelOrder(orderId){
     const d=await r.json();
     if(d.status==='success'){
       showStatus('Order cancelled',false);
-      setTimeout(()=>{refreshPositions();refreshPendingOrders();},1000);
+      setTimeout(refreshPositions,1000);
     }else{
       showStatus('Cancel failed: '+(d.message||'Unknown error'),true);
     }
@@ -716,16 +1083,14 @@ async function refreshMarketStatus(){
 }
 refreshMarketStatus();
 setInterval(refreshMarketStatus,10000);
-refreshPositions();"""
+loadConfig().then(refreshPositions,e=>showStatus('Cannot reach server: '+e.message,true));"""
 
 
-def _card_html(label, sym, qty_lots, instrument_type):
+def _card_html(label, sym, qty_lots, instrument_type, option_type):
     # Determine strike step based on instrument type
     is_banknifty = instrument_type == 'banknifty'
     step_small = 100 if is_banknifty else 50
     step_big = 500 if is_banknifty else 100
-    # Detect if this is CE or PE from the symbol
-    option_type = 'ce' if 'CE' in sym else 'pe'
     
     return (
         f'<div class="card" id="card_{sym}">\n'
@@ -739,7 +1104,10 @@ def _card_html(label, sym, qty_lots, instrument_type):
         f'  </div>\n'
         f'  <div class="card-sym" title="{sym}" id="sym_{sym}">{sym}</div>\n'
         f'  <div class="pos-badge badge-flat" id="badge_{sym}">loading\u2026</div>\n'
-        f'  <div class="btn-row" id="btns_{sym}"></div>\n'
+        f'  <div class="btn-row" id="btns_{sym}" style="display:none">'
+        f'<button class="btn-half" data-sym="{sym}">HALF</button>'
+        f'<button class="btn-rev" data-sym="{sym}">REVERSE</button>'
+        f'<button class="btn-add" data-sym="{sym}">+{qty_lots}L</button></div>\n'
         f'  <div id="pending_{sym}" class="pending-orders-sec" style="display:none;">\n'
         f'    <div class="sec-label">Pending Orders</div>\n'
         f'    <div id="pending_list_{sym}"></div>\n'
@@ -769,49 +1137,126 @@ def _card_html(label, sym, qty_lots, instrument_type):
     )
 
 
-def render_trading(cards, lot_sizes, symbols, qty_lots):
-    # Map symbols to instrument types
-    sym_to_instrument = {}
-    for label, sym, _ in cards:
-        if 'banknifty' in sym.lower():
-            sym_to_instrument[sym] = 'banknifty'
-        else:
-            sym_to_instrument[sym] = 'nifty'
-    cards_html = ''.join(_card_html(label, sym, qty_lots, sym_to_instrument.get(sym, 'nifty')) for label, sym, _ in cards)
+# ── Static assets ─────────────────────────────────────────────────────────
+
+def _header_block(pairs):
+    """Format (name, value) pairs as header lines, for _Handler._respond()."""
+    return ''.join(f'{name}: {value}\r\n' for name, value in pairs)
+
+
+# The pages' CSS and JS are served as separate, browser-cacheable files.
+# path -> (plain, gzipped) variants, each (body, ETag, 200 headers, 304
+# headers), all built once at import; pages link them with ?v=<digest> so
+# a changed file gets a new URL and can be cached as immutable.
+_STATIC = {}
+_STATIC_URL = {}
+_STATIC_CACHE_CONTROL = 'public, max-age=604800, immutable'
+
+
+def _register_static(path, ctype, text):
+    data   = text.encode('utf-8')
+    digest = hashlib.sha256(data).hexdigest()[:32]
+    variants = []
+    for body, etag, encoding in ((data, f'"{digest}"', ()),
+                                 (gzip.compress(data, 9), f'"{digest}-gz"',
+                                  (('Content-Encoding', 'gzip'),))):
+        not_modified = _header_block((('ETag', etag),
+                                      ('Cache-Control', _STATIC_CACHE_CONTROL)))
+        variants.append((body, etag,
+                         _header_block((('Content-Type', ctype),) + encoding +
+                                       (('Vary', 'Accept-Encoding'),)) + not_modified,
+                         not_modified))
+    _STATIC[path] = tuple(variants)
+    _STATIC_URL[path] = f'{path}?v={digest[:12]}'
+
+
+_register_static('/static/trading.css', 'text/css; charset=utf-8', _TRADING_CSS)
+_register_static('/static/trading.js', 'application/javascript; charset=utf-8', _TRADING_JS)
+
+
+# Everything before and after the cards is fixed text,
+# so it is assembled once here rather than on every render
+_TRADING_HEAD = (
+    '<!DOCTYPE html><html lang="en"><head>'
+    '<meta charset="utf-8">'
+    '<meta name="viewport" content="width=device-width, initial-scale=1">'
+    '<title>Trading App</title>'
+    '<link rel="stylesheet" href="' + _STATIC_URL['/static/trading.css'] + '">'
+    '</head><body>\n'
+    '<div id="app-wrapper">'
+    '<div class="topbar">'
+    '<div class="mkt-status"><span class="mkt-badge mkt-na" id="mkt-badge">N/A</span></div>'
+    '<div class="topbar-right">'
+    '<span class="api-dot" id="api-dot" title="API status"></span>'
+    '<button class="btn-theme" id="theme-btn" onclick="toggleTheme()" title="Toggle theme">\u263d</button>'
+    '<button class="btn-theme" id="layout-btn" onclick="toggleLayout()" title="Switch to Horizontal">\u2b0c</button>'
+    '<button class="btn-refresh" onclick="refreshPositions()" title="Refresh">\u21ba</button>'
+    '<a href="/settings" class="btn-settings" title="Settings">\u2699\ufe0f</a>'
+    '</div></div>\n'
+    '<div id="status-bar"></div>\n'
+    '<div class="pos-bar" id="pos-bar">'
+    '<span style="color:var(--text-muted)">Loading positions\u2026</span>'
+    '</div>\n'
+    '<div class="cards-row" id="cards-container">\n'
+)
+_TRADING_TAIL = ('<script src="' + _STATIC_URL['/static/trading.js'] + '"></script>'
+                 '</body></html>')
+# Neither fixed part contains braces, so they can wrap a format template
+_TRADING_TEMPLATE = (
+    _TRADING_HEAD +
+    '{cards}'
+    '</div>\n'
+    '</div>\n' +
+    _TRADING_TAIL
+)
+
+
+def trading_cards(settings):
+    """The trading page's cards as (label, symbol, lot_size, instrument, option_type)."""
+    n, b = settings['nifty'], settings['banknifty']
+    return _trading_cards(n['expiry'], n['strike_ce'], n['strike_pe'], n['lot_size'],
+                          b['expiry'], b['strike_ce'], b['strike_pe'], b['lot_size'])
+
+
+# Keyed on just the fields the cards use, so GET / and /api/config build
+# the tuple once per settings change rather than once per request
+@functools.lru_cache(maxsize=4)
+def _trading_cards(n_expiry, n_ce, n_pe, n_lot, b_expiry, b_ce, b_pe, b_lot):
+    syms = _build_symbols(n_expiry, n_ce, n_pe, b_expiry, b_ce, b_pe)
     return (
-        '<!DOCTYPE html><html lang="en"><head>'
-        '<meta charset="utf-8">'
-        '<meta name="viewport" content="width=device-width, initial-scale=1">'
-        '<title>Trading App</title>'
-        '<style>' + _TRADING_CSS + '</style>'
-        '</head><body>\n'
-        '<div id="app-wrapper">'
-        '<div class="topbar">'
-        '<div class="mkt-status"><span class="mkt-badge mkt-na" id="mkt-badge">N/A</span></div>'
-        '<div class="topbar-right">'
-        '<span class="api-dot" id="api-dot" title="API status"></span>'
-        '<button class="btn-theme" id="theme-btn" onclick="toggleTheme()" title="Toggle theme">\u263d</button>'
-        '<button class="btn-theme" id="layout-btn" onclick="toggleLayout()" title="Switch to Horizontal">\u2b0c</button>'
-        '<button class="btn-refresh" onclick="refreshPositions()" title="Refresh">\u21ba</button>'
-        '<a href="/settings" class="btn-settings" title="Settings">\u2699\ufe0f</a>'
-        '</div></div>\n'
-        '<div id="status-bar"></div>\n'
-        '<div class="pos-bar" id="pos-bar">'
-        '<span style="color:var(--text-muted)">Loading positions\u2026</span>'
-        '</div>\n'
-        '<div class="cards-row" id="cards-container">\n' +
-        cards_html +
-        '</div>\n'
-        '</div>\n'
-        '<script>\n'
-        'const LOT_SIZES=' + json.dumps(lot_sizes) + ';\n'
-        'const SYMBOLS='   + json.dumps(symbols)   + ';\n'
-        'const QTY_LOTS='  + str(qty_lots)          + ';\n' +
-        _TRADING_JS +
-        '\n</script></body></html>'
+        ('NIFTY CE',  syms['nifty_ce'],     n_lot, 'nifty',     'ce'),
+        ('NIFTY PE',  syms['nifty_pe'],     n_lot, 'nifty',     'pe'),
+        ('BNIFTY CE', syms['banknifty_ce'], b_lot, 'banknifty', 'ce'),
+        ('BNIFTY PE', syms['banknifty_pe'], b_lot, 'banknifty', 'pe'),
     )
 
 
+@functools.lru_cache(maxsize=16)
+def trading_config(cards, qty_lots):
+    """/api/config body as (JSON bytes, ETag digest): the card symbols and
+    sizes the page script works with, encoded once per settings change."""
+    body = _dumps({
+        'lot_sizes': {sym: ls for _, sym, ls, _, _ in cards},
+        'symbols':   [sym for _, sym, _, _, _ in cards],
+        'qty_lots':  qty_lots,
+    })
+    return body, hashlib.blake2b(body, digest_size=8).hexdigest()
+
+
+@functools.lru_cache(maxsize=16)
+def render_trading(cards, qty_lots):
+    """Trading page as (html bytes, gzipped bytes).
+
+    `cards` is a tuple from trading_cards(); the page only changes when
+    settings do, so each variant is rendered and compressed once. The
+    script gets its symbols and lot sizes from /api/config.
+    """
+    cards_html = ''.join(_card_html(label, sym, qty_lots, instrument, option)
+                         for label, sym, _, instrument, option in cards)
+    html = _TRADING_TEMPLATE.format_map({'cards': cards_html}).encode('utf-8')
+    return html, gzip.compress(html, 9)
+
+
 # ── Settings page ─────────────────────────────────────────────────────────
 
 _SETTINGS_CSS = """\
@@ -918,135 +1363,252 @@ document.addEventListener('DOMContentLoaded', function() {
 });"""
 
 
-def render_settings(s, api_ok, openalgo_url):
+_register_static('/static/settings.css', 'text/css; charset=utf-8', _SETTINGS_CSS)
+_register_static('/static/settings.js', 'application/javascript; charset=utf-8', _SETTINGS_JS)
+
+
+# The whole page as one template, filled by format_map() on each render.
+# Static text only appears here once, and since the CSS/JS live in
+# /static, the only braces left are the placeholders.
+_SETTINGS_TEMPLATE = (
+    '<!DOCTYPE html><html lang="en"><head>'
+    '<meta charset="utf-8">'
+    '<meta name="viewport" content="width=device-width, initial-scale=1">'
+    '<title>Settings \u2014 Trading App</title>'
+    '<link rel="stylesheet" href="' + _STATIC_URL['/static/settings.css'] + '">'
+    '</head><body>\n'
+    '<div class="topbar"><h1>Settings</h1>'
+    '<div class="topbar-right">'
+    '<button class="btn-theme" id="theme-btn" onclick="toggleTheme()">Light</button>'
+    '</div></div>\n'
+    '<div class="container">\n'
+    '{banner}'
+    '<form method="POST" action="/settings">\n'
+    '<h2>NIFTY</h2>\n'
+    '<div class="field"><label>Expiry</label>'
+    '<input type="date" id="nifty_expiry_picker" onchange="convertToExpiryFormat(\'nifty\')" required>'
+    '<input type="hidden" name="nifty_expiry" id="nifty_expiry" value="{nifty_expiry}"></div>\n'
+    '<div class="row">'
+    '<div class="field"><label>CE Strike</label>'
+    '<input type="text" name="nifty_strike_ce" value="{nifty_strike_ce}" required></div>'
+    '<div class="field"><label>PE Strike</label>'
+    '<input type="text" name="nifty_strike_pe" value="{nifty_strike_pe}" required></div>'
+    '<div class="field"><label>Lot Size</label>'
+    '<input type="number" name="nifty_lot_size" value="{nifty_lot_size}" min="1" required></div>'
+    '</div>\n'
+    '<div class="sep"></div>\n'
+    '<h2>BANKNIFTY</h2>\n'
+    '<div class="field"><label>Expiry</label>'
+    '<input type="date" id="banknifty_expiry_picker" onchange="convertToExpiryFormat(\'banknifty\')" required>'
+    '<input type="hidden" name="banknifty_expiry" id="banknifty_expiry" value="{banknifty_expiry}"></div>\n'
+    '<div class="row">'
+    '<div class="field"><label>CE Strike</label>'
+    '<input type="text" name="banknifty_strike_ce" value="{banknifty_strike_ce}" required></div>'
+    '<div class="field"><label>PE Strike</label>'
+    '<input type="text" name="banknifty_strike_pe" value="{banknifty_strike_pe}" required></div>'
+    '<div class="field"><label>Lot Size</label>'
+    '<input type="number" name="banknifty_lot_size" value="{banknifty_lot_size}" min="1" required></div>'
+    '</div>\n'
+    '<div class="sep"></div>\n'
+    '<h2>Order Defaults</h2>\n'
+    '<div class="row">'
+    '<div class="field"><label>Default Lots</label>'
+    '<input type="number" name="quantity_lots" value="{quantity_lots}" min="1" required>'
+    '<div class="hint">Used for LONG / SHORT entry buttons</div></div>'
+    '<div class="field"><label>Product Type</label>'
+    '<select name="product">'
+    '<option value="MIS" {mis_sel}>MIS (Intraday)</option>'
+    '<option value="NRML" {nrml_sel}>NRML (Overnight F&amp;O)</option>'
+    '</select></div>'
+    '</div>\n'
+    '<div class="sep"></div>\n'
+    '<h2>User Interface</h2>\n'
+    '<div class="field"><label>Cards Layout</label>'
+    '<select name="cards_layout">'
+    '<option value="horizontal" {horz_sel}>Horizontal (side by side)</option>'
+    '<option value="vertical" {vert_sel}>Vertical (stacked)</option>'
+    '</select>'
+    '<div class="hint">How trading cards are arranged on screen</div></div>\n'
+    '<div class="actions">'
+    '<a href="/" class="btn-back">Back</a>'
+    '<button type="submit" class="btn-save">Save Settings</button>'
+    '</div>\n'
+    '</form>\n'
+    '</div>\n'
+    '<script src="' + _STATIC_URL['/static/settings.js'] + '"></script>'
+    '</body></html>'
+)
+
+
+# The API config comes from the environment at startup, so both banners are fixed
+_BANNER_OK = (f'<div class="info-box info-ok">'
+              f'API key configured &nbsp;&middot;&nbsp; {OPENALGO_URL}'
+              f'</div>\n')
+_BANNER_WARN = (f'<div class="info-box info-warn">'
+                f'API key not set. Edit <strong>.env</strong> in the app folder:<br>'
+                f'<code style="font-size:12px">OPENALGO_API_KEY=your_key_here</code><br>'
+                f'<code style="font-size:12px">OPENALGO_URL={OPENALGO_URL}</code>'
+                f'</div>\n')
+
+
+def render_settings(s, api_ok):
     n, b, c, ui = s['nifty'], s['banknifty'], s['common'], s['ui']
+    return _SETTINGS_TEMPLATE.format_map({
+        'banner':              _BANNER_OK if api_ok else _BANNER_WARN,
+        'nifty_expiry':        n['expiry'],
+        'nifty_strike_ce':     n['strike_ce'],
+        'nifty_strike_pe':     n['strike_pe'],
+        'nifty_lot_size':      n['lot_size'],
+        'banknifty_expiry':    b['expiry'],
+        'banknifty_strike_ce': b['strike_ce'],
+        'banknifty_strike_pe': b['strike_pe'],
+        'banknifty_lot_size':  b['lot_size'],
+        'quantity_lots':       c['quantity_lots'],
+        'mis_sel':  'selected' if c['product'] == 'MIS'  else '',
+        'nrml_sel': 'selected' if c['product'] == 'NRML' else '',
+        'horz_sel': 'selected' if ui['cards_layout'] == 'horizontal' else '',
+        'vert_sel': 'selected' if ui['cards_layout'] == 'vertical' else '',
+    })
 
-    if api_ok:
-        banner = (f'<div class="info-box info-ok">'
-                  f'API key configured &nbsp;&middot;&nbsp; {openalgo_url}'
-                  f'</div>\n')
-    else:
-        banner = (f'<div class="info-box info-warn">'
-                  f'API key not set. Edit <strong>.env</strong> in the app folder:<br>'
-                  f'<code style="font-size:12px">OPENALGO_API_KEY=your_key_here</code><br>'
-                  f'<code style="font-size:12px">OPENALGO_URL={openalgo_url}</code>'
-                  f'</div>\n')
-
-    mis_sel  = 'selected' if c['product'] == 'MIS'  else ''
-    nrml_sel = 'selected' if c['product'] == 'NRML' else ''
-    horz_sel = 'selected' if ui['cards_layout'] == 'horizontal' else ''
-    vert_sel = 'selected' if ui['cards_layout'] == 'vertical' else ''
-
-    form = (
-        '<form method="POST" action="/settings">\n'
-        '<h2>NIFTY</h2>\n'
-        '<div class="field"><label>Expiry</label>'
-        '<input type="date" id="nifty_expiry_picker" onchange="convertToExpiryFormat(\'nifty\')" required>'
-        f'<input type="hidden" name="nifty_expiry" id="nifty_expiry" value="{n["expiry"]}"></div>\n'
-        '<div class="row">'
-        '<div class="field"><label>CE Strike</label>'
-        f'<input type="text" name="nifty_strike_ce" value="{n["strike_ce"]}" required></div>'
-        '<div class="field"><label>PE Strike</label>'
-        f'<input type="text" name="nifty_strike_pe" value="{n["strike_pe"]}" required></div>'
-        '<div class="field"><label>Lot Size</label>'
-        f'<input type="number" name="nifty_lot_size" value="{n["lot_size"]}" min="1" required></div>'
-        '</div>\n'
-        '<div class="sep"></div>\n'
-        '<h2>BANKNIFTY</h2>\n'
-        '<div class="field"><label>Expiry</label>'
-        '<input type="date" id="banknifty_expiry_picker" onchange="convertToExpiryFormat(\'banknifty\')" required>'
-        f'<input type="hidden" name="banknifty_expiry" id="banknifty_expiry" value="{b["expiry"]}"></div>\n'
-        '<div class="row">'
-        '<div class="field"><label>CE Strike</label>'
-        f'<input type="text" name="banknifty_strike_ce" value="{b["strike_ce"]}" required></div>'
-        '<div class="field"><label>PE Strike</label>'
-        f'<input type="text" name="banknifty_strike_pe" value="{b["strike_pe"]}" required></div>'
-        '<div class="field"><label>Lot Size</label>'
-        f'<input type="number" name="banknifty_lot_size" value="{b["lot_size"]}" min="1" required></div>'
-        '</div>\n'
-        '<div class="sep"></div>\n'
-        '<h2>Order Defaults</h2>\n'
-        '<div class="row">'
-        '<div class="field"><label>Default Lots</label>'
-        f'<input type="number" name="quantity_lots" value="{c["quantity_lots"]}" min="1" required>'
-        '<div class="hint">Used for LONG / SHORT entry buttons</div></div>'
-        '<div class="field"><label>Product Type</label>'
-        '<select name="product">'
-        f'<option value="MIS" {mis_sel}>MIS (Intraday)</option>'
-        f'<option value="NRML" {nrml_sel}>NRML (Overnight F&amp;O)</option>'
-        '</select></div>'
-        '</div>\n'
-        '<div class="sep"></div>\n'
-        '<h2>User Interface</h2>\n'
-        '<div class="field"><label>Cards Layout</label>'
-        '<select name="cards_layout">'
-        f'<option value="horizontal" {horz_sel}>Horizontal (side by side)</option>'
-        f'<option value="vertical" {vert_sel}>Vertical (stacked)</option>'
-        '</select>'
-        '<div class="hint">How trading cards are arranged on screen</div></div>\n'
-        ''
-        '<div class="actions">'
-        '<a href="/" class="btn-back">Back</a>'
-        '<button type="submit" class="btn-save">Save Settings</button>'
-        '</div>\n'
-        '</form>\n'
-    )
 
-    return (
-        '<!DOCTYPE html><html lang="en"><head>'
-        '<meta charset="utf-8">'
-        '<meta name="viewport" content="width=device-width, initial-scale=1">'
-        '<title>Settings \u2014 Trading App</title>'
-        '<style>' + _SETTINGS_CSS + '</style>'
-        '</head><body>\n'
-        '<div class="topbar"><h1>Settings</h1>'
-        '<div class="topbar-right">'
-        '<button class="btn-theme" id="theme-btn" onclick="toggleTheme()">Light</button>'
-        '</div></div>\n'
-        '<div class="container">\n' +
-        banner + form +
-        '</div>\n'
-        '<script>' + _SETTINGS_JS + '</script>'
-        '</body></html>'
-    )
+_settings_page = {'last': (None, None)}
+
+
+def settings_page(s):
+    """Settings page as (html bytes, gzipped bytes).
+
+    Rendering is skipped while the settings are unchanged since the last
+    request; the serialized settings are the cache key, so a save (or an
+    edit of settings.json) produces a new page.
+    """
+    key = _dumps(s)
+    last_key, page = _settings_page['last']
+    if key != last_key:
+        html = render_settings(s, bool(OPENALGO_API_KEY)).encode('utf-8')
+        page = (html, gzip.compress(html, 9))
+        _settings_page['last'] = (key, page)
+    return page
 
 
 # ── HTTP Handler ──────────────────────────────────────────────────────────
 
+# Smaller JSON bodies are sent as is: gzip would save little over its overhead
+GZIP_MIN_BYTES = 1024
+
+_HTML_TYPE       = 'text/html; charset=utf-8'
+_NOT_FOUND_BYTES = b'<h3>404 Not Found</h3>'
+
+# Fixed header sets, formatted once; _respond() adds Date, Connection and
+# Content-Length
+_NO_STORE = _header_block((
+    ('Cache-Control', 'no-cache, no-store, must-revalidate'),
+    ('Pragma',        'no-cache'),
+    ('Expires',       '0'),
+))
+_GZIPPED          = _header_block((('Content-Encoding', 'gzip'), ('Vary', 'Accept-Encoding')))
+_JSON_NO_STORE    = 'Content-Type: application/json\r\n' + _NO_STORE
+_PAGE_HEADERS     = _header_block((('Content-Type', _HTML_TYPE),
+                                   ('Vary', 'Accept-Encoding'))) + _NO_STORE
+_PAGE_HEADERS_GZ  = f'Content-Type: {_HTML_TYPE}\r\n' + _GZIPPED + _NO_STORE
+
+_date_header = (0, '')
+
+
+def _http_date():
+    """Date header value, formatted at most once a second."""
+    global _date_header
+    now = int(time.time())
+    if _date_header[0] != now:
+        _date_header = (now, email.utils.formatdate(now, usegmt=True))
+    return _date_header[1]
+
+
 class _Handler(BaseHTTPRequestHandler):
+    # Persistent connections: the page and the PWA proxy poll every few
+    # seconds, so each reuses one socket instead of reconnecting per poll.
+    # Every response carries a Content-Length, as HTTP/1.1 requires. An
+    # idle connection is dropped after `timeout` seconds, freeing its thread.
+    protocol_version = 'HTTP/1.1'
+    timeout          = 30
 
     def log_message(self, fmt, *args):  # noqa: keep default logging
         print(f"  [{self.address_string()}] {fmt % args}")
 
     # ── helpers ──
 
+    def _respond(self, code, body=b'', headers=''):
+        """Write status line, headers and body with a single wfile.write(),
+        instead of one buffered write per send_header() call. `headers` is
+        a block of formatted header lines (see _header_block)."""
+        self.log_request(code)
+        if self.close_connection:
+            conn = 'Connection: close\r\n'
+        elif self.request_version != 'HTTP/1.1':
+            conn = 'Connection: keep-alive\r\n'   # HTTP/1.0 client asked for it
+        else:
+            conn = ''
+        length = '' if code == 304 else f'Content-Length: {len(body)}\r\n'
+        self.wfile.write(f'{_STATUS_LINES[code]}Date: {_http_date()}\r\n'
+                         f'{headers}{conn}{length}\r\n'.encode('latin-1') + body)
+
     def _send_html(self, html, code=200):
-        body = html.encode('utf-8')
-        self.send_response(code)
-        self.send_header('Content-Type', 'text/html; charset=utf-8')
-        self.send_header('Content-Length', str(len(body)))
-        self.send_header('Cache-Control', 'no-cache, no-store, must-revalidate')
-        self.send_header('Pragma', 'no-cache')
-        self.send_header('Expires', '0')
-        self.end_headers()
-        self.wfile.write(body)
-
-    def _send_json(self, data, code=200):
-        body = json.dumps(data).encode('utf-8')
-        self.send_response(code)
-        self.send_header('Content-Type', 'application/json')
-        self.send_header('Content-Length', str(len(body)))
-        self.send_header('Cache-Control', 'no-cache, no-store, must-revalidate')
-        self.send_header('Pragma', 'no-cache')
-        self.send_header('Expires', '0')
-        self.end_headers()
-        self.wfile.write(body)
+        self._send_bytes(html.encode('utf-8'), _HTML_TYPE, code)
+
+    def _send_bytes(self, body, ctype, code=200):
+        """Send an already-encoded, uncacheable body."""
+        self._respond(code, body, f'Content-Type: {ctype}\r\n' + _NO_STORE)
+
+    def _send_page(self, html, gzipped):
+        """Send a pre-encoded HTML page, compressed if the client accepts gzip."""
+        if 'gzip' in self.headers.get('Accept-Encoding', ''):
+            self._respond(200, gzipped, _PAGE_HEADERS_GZ)
+        else:
+            self._respond(200, html, _PAGE_HEADERS)
+
+    def _send_static(self, path):
+        """Serve a pre-encoded asset from _STATIC, gzipped if accepted;
+        a matching If-None-Match gets a bodyless 304."""
+        plain, gzipped = _STATIC[path]
+        use_gzip = 'gzip' in self.headers.get('Accept-Encoding', '')
+        data, etag, headers, not_modified = gzipped if use_gzip else plain
+        if etag in self.headers.get('If-None-Match', ''):
+            self._respond(304, headers=not_modified)
+        else:
+            self._respond(200, data, headers)
+
+    def _send_json(self, data, code=200, etag=False, max_age=0):
+        """Send data as JSON. Bodies of GZIP_MIN_BYTES or more are gzipped
+        (fast level 1) for clients that accept it. With etag=True the body's
+        hash is sent as an ETag and a poll whose If-None-Match matches gets
+        a bodyless 304; max_age lets the browser reuse it without asking for
+        that many seconds."""
+        self._send_json_bytes(_dumps(data), code, etag, max_age)
+
+    def _send_json_bytes(self, body, code=200, etag=False, max_age=0, digest=None):
+        """_send_json for an already-encoded body; `digest` is its ETag
+        digest if the caller has it precomputed."""
+        use_gzip = (len(body) >= GZIP_MIN_BYTES and
+                    'gzip' in self.headers.get('Accept-Encoding', ''))
+        if etag:
+            tag = digest or hashlib.blake2b(body, digest_size=8).hexdigest()
+            tag = f'"{tag}-gz"' if use_gzip else f'"{tag}"'
+            # private: account data must not sit in a shared cache; no-cache
+            # (not no-store) so the browser keeps the body and revalidates
+            cache = f'private, max-age={max_age}' if max_age else 'private, no-cache'
+            validators = f'ETag: {tag}\r\nCache-Control: {cache}\r\n'
+            if tag in self.headers.get('If-None-Match', ''):
+                self._respond(304, headers=validators)
+                return
+            headers = 'Content-Type: application/json\r\n' + validators
+        else:
+            headers = _JSON_NO_STORE
+        if use_gzip:
+            body = gzip.compress(body, 1)
+            headers += _GZIPPED
+        self._respond(code, body, headers)
 
     def _redirect(self, location):
-        self.send_response(302)
-        self.send_header('Location', location)
-        self.send_header('Content-Length', '0')
-        self.end_headers()
+        self._respond(302, headers=f'Location: {location}\r\n')
 
     def _read_body(self):
         length = int(self.headers.get('Content-Length', 0))
@@ -1054,141 +1616,217 @@ class _Handler(BaseHTTPRequestHandler):
 
     # ── routes ──
 
+    def _get_home(self):
+        settings = load_settings()
+        self._send_page(*render_trading(
+            trading_cards(settings), settings['common']['quantity_lots']))
+
+    def _get_config(self):
+        settings = load_settings()
+        body, digest = trading_config(trading_cards(settings),
+                                      settings['common']['quantity_lots'])
+        self._send_json_bytes(body, etag=True, digest=digest)
+
+    def _get_settings(self):
+        self._send_page(*settings_page(load_settings()))
+
+    def _get_ping(self):
+        print(f"  PING  \u2190  {self.client_address[0]}:{self.client_address[1]}")
+        self._send_json({"status": "ok"})
+
+    def _get_positions(self):
+        self._send_json(positions_with_status(), etag=True)
+
+    def _get_refresh(self):
+        self._send_json(refresh(), etag=True)
+
+    def _get_pending_orders(self):
+        self._send_json(get_pending_orders(), etag=True)
+
+    def _get_market_status(self):
+        # Changes rarely, so callers may reuse it for a few seconds
+        self._send_json(get_market_status(), etag=True, max_age=5)
+
+    def _post_settings(self, body):
+        form = dict(parse_qsl(body.decode('utf-8')))
+        def fg(k, default=''): return form.get(k, default)
+        save_settings({
+            'nifty': {
+                'expiry':    fg('nifty_expiry').strip().upper(),
+                'strike_ce': _as_int(fg('nifty_strike_ce').strip()),
+                'strike_pe': _as_int(fg('nifty_strike_pe').strip()),
+                'lot_size':  int(fg('nifty_lot_size', '65')),
+            },
+            'banknifty': {
+                'expiry':    fg('banknifty_expiry').strip().upper(),
+                'strike_ce': _as_int(fg('banknifty_strike_ce').strip()),
+                'strike_pe': _as_int(fg('banknifty_strike_pe').strip()),
+                'lot_size':  int(fg('banknifty_lot_size', '30')),
+            },
+            'common': {
+                'quantity_lots': int(fg('quantity_lots', '2')),
+                'product':       fg('product', 'MIS'),
+            },
+            'ui': {
+                'cards_layout': fg('cards_layout', 'horizontal'),
+            },
+        })
+        self._redirect('/')
+
+    def _post_sync_order_status(self, body):
+        self._send_json(poll_order_status())
+
+    def _post_smart_order(self, body):
+        data   = _loads(body)
+        result = place_smart_order(
+            symbol          = data['symbol'],
+            target_position = int(data['target_position']),
+            pricetype       = data.get('pricetype', 'MARKET'),
+            price           = data.get('price'),
+            trigger_price   = data.get('trigger_price'),
+        )
+        self._send_json(result)
+
+    def _post_cancel_order(self, body):
+        data   = _loads(body)
+        result = cancel_order_by_id(data['order_id'])
+        self._send_json(result)
+
+    def _post_update_strike(self, body):
+        data        = _loads(body)
+        instrument  = data.get('instrument')
+        option_type = data.get('option_type', 'ce')
+        delta       = int(data.get('delta', 0))
+
+        prefix = _INSTRUMENT_PREFIX.get(instrument)
+        if prefix is None or option_type not in ('ce', 'pe'):
+            self._send_json({"status": "error", "message": "Unknown instrument"}, 400)
+            return
+        settings   = load_settings()
+        key        = f'strike_{option_type}'
+        old_strike = settings[instrument][key]
+        new_strike = old_strike + delta
+        settings[instrument][key] = new_strike
+        expiry     = settings[instrument]['expiry']
+        suffix     = option_type.upper()
+
+        save_settings(settings)
+        self._send_json({
+            'status': 'success',
+            'old_strike': str(old_strike),
+            'new_strike': str(new_strike),
+            'old_symbol': f"{prefix}{expiry}{old_strike}{suffix}",
+            'new_symbol': f"{prefix}{expiry}{new_strike}{suffix}",
+        })
+
+    # path -> route method; anything else under GET may be a static asset
+    _GET_ROUTES = {
+        '/':                      _get_home,
+        '/api/config':            _get_config,
+        '/settings':              _get_settings,
+        '/api/ping':              _get_ping,
+        '/api/positions':         _get_positions,
+        '/api/refresh':           _get_refresh,
+        '/api/pending_orders':    _get_pending_orders,
+        '/api/market_status':     _get_market_status,
+    }
+    _POST_ROUTES = {
+        '/settings':              _post_settings,
+        '/api/sync_order_status': _post_sync_order_status,
+        '/api/smart_order':       _post_smart_order,
+        '/api/cancel_order':      _post_cancel_order,
+        '/api/update_strike':     _post_update_strike,
+    }
+
     def do_GET(self):
         path = urlparse(self.path).path
         try:
-            if path == '/':
-                settings  = load_settings()
-                syms      = build_symbols(settings)
-                cards = [
-                    ('NIFTY CE',  syms['nifty_ce'],     settings['nifty']['lot_size']),
-                    ('NIFTY PE',  syms['nifty_pe'],     settings['nifty']['lot_size']),
-                    ('BNIFTY CE', syms['banknifty_ce'], settings['banknifty']['lot_size']),
-                    ('BNIFTY PE', syms['banknifty_pe'], settings['banknifty']['lot_size']),
-                ]
-                lot_sizes = {sym: ls for _, sym, ls in cards}
-                symbols   = [sym for _, sym, _ in cards]
-                self._send_html(render_trading(
-                    cards, lot_sizes, symbols,
-                    settings['common']['quantity_lots']))
-
-            elif path == '/settings':
-                s = load_settings()
-                self._send_html(render_settings(s, bool(OPENALGO_API_KEY), OPENALGO_URL))
-
-            elif path == '/api/ping':
-                print(f"  PING  \u2190  {self.client_address[0]}:{self.client_address[1]}")
-                self._send_json({"status": "ok"})
-
-            elif path == '/api/positions':
-                self._send_json({"api_ok": ping_openalgo(), "data": get_positions()})
-
-            elif path == '/api/pending_orders':
-                self._send_json(get_pending_orders())
-
-            elif path == '/api/market_status':
-                self._send_json(get_market_status())
-
+            route = self._GET_ROUTES.get(path)
+            if route:
+                route(self)
+            elif path in _STATIC:
+                self._send_static(path)
             else:
-                self._send_html('<h3>404 Not Found</h3>', 404)
-
+                self._send_bytes(_NOT_FOUND_BYTES, _HTML_TYPE, 404)
         except Exception as exc:
             self._send_html(f'<h3>Server Error</h3><pre>{exc}</pre>', 500)
 
     def do_POST(self):
-        path = urlparse(self.path).path
+        route = self._POST_ROUTES.get(urlparse(self.path).path)
+        # Always read the whole body: on a kept-alive connection any unread
+        # bytes would be parsed as the next request
+        body = self._read_body()
         try:
-            if path == '/settings':
-                raw  = self._read_body().decode('utf-8')
-                form = parse_qs(raw)
-                def fg(k, default=''): return form.get(k, [default])[0]
-                save_settings({
-                    'nifty': {
-                        'expiry':    fg('nifty_expiry').strip().upper(),
-                        'strike_ce': fg('nifty_strike_ce').strip(),
-                        'strike_pe': fg('nifty_strike_pe').strip(),
-                        'lot_size':  int(fg('nifty_lot_size', '65')),
-                    },
-                    'banknifty': {
-                        'expiry':    fg('banknifty_expiry').strip().upper(),
-                        'strike_ce': fg('banknifty_strike_ce').strip(),
-                        'strike_pe': fg('banknifty_strike_pe').strip(),
-                        'lot_size':  int(fg('banknifty_lot_size', '30')),
-                    },
-                    'common': {
-                        'quantity_lots': int(fg('quantity_lots', '2')),
-                        'product':       fg('product', 'MIS'),
-                    },
-                    'ui': {
-                        'cards_layout': fg('cards_layout', 'horizontal'),
-                    },
-                })
-                self._redirect('/')
-
-            elif path == '/api/sync_order_status':
-                self._send_json(sync_order_status())
-
-            elif path == '/api/smart_order':
-                data   = json.loads(self._read_body().decode('utf-8'))
-                result = place_smart_order(
-                    symbol          = data['symbol'],
-                    target_position = int(data['target_position']),
-                    pricetype       = data.get('pricetype', 'MARKET'),
-                    price           = data.get('price'),
-                    trigger_price   = data.get('trigger_price'),
-                )
-                self._send_json(result)
-
-            elif path == '/api/cancel_order':
-                data   = json.loads(self._read_body().decode('utf-8'))
-                result = cancel_order_by_id(data['order_id'])
-                self._send_json(result)
-
-            elif path == '/api/update_strike':
-                data = json.loads(self._read_body().decode('utf-8'))
-                instrument = data.get('instrument')
-                option_type = data.get('option_type', 'ce')
-                delta = int(data.get('delta', 0))
-                
-                settings = load_settings()
-                syms = build_symbols(settings)
-                
-                if instrument == 'nifty':
-                    old_strike = int(settings['nifty'][f'strike_{option_type}'])
-                    new_strike = old_strike + delta
-                    settings['nifty'][f'strike_{option_type}'] = str(new_strike)
-                    expiry = settings['nifty']['expiry']
-                    suffix = 'CE' if option_type == 'ce' else 'PE'
-                    old_symbol = f"NIFTY{expiry}{old_strike}{suffix}"
-                    new_symbol = f"NIFTY{expiry}{new_strike}{suffix}"
-                elif instrument == 'banknifty':
-                    old_strike = int(settings['banknifty'][f'strike_{option_type}'])
-                    new_strike = old_strike + delta
-                    settings['banknifty'][f'strike_{option_type}'] = str(new_strike)
-                    expiry = settings['banknifty']['expiry']
-                    suffix = 'CE' if option_type == 'ce' else 'PE'
-                    old_symbol = f"BANKNIFTY{expiry}{old_strike}{suffix}"
-                    new_symbol = f"BANKNIFTY{expiry}{new_strike}{suffix}"
-                
-                save_settings(settings)
-                self._send_json({
-                    'status': 'success',
-                    'old_strike': str(old_strike),
-                    'new_strike': str(new_strike),
-                    'old_symbol': old_symbol,
-                    'new_symbol': new_symbol
-                })
-
+            if route:
+                route(self, body)
             else:
-                self._send_html('<h3>404 Not Found</h3>', 404)
-
+                self._send_bytes(_NOT_FOUND_BYTES, _HTML_TYPE, 404)
         except Exception as exc:
             self._send_json({'status': 'error', 'message': str(exc)}, 500)
 
 
-class _ThreadingServer(socketserver.ThreadingMixIn, HTTPServer):
-    """Handle each request in a separate thread."""
-    daemon_threads = True
+# code -> status line plus Server header, for every status _respond may send
+_STATUS_LINES = {
+    code: (f'{_Handler.protocol_version} {code} {phrase}\r\n'
+           f'Server: {_Handler.server_version} {_Handler.sys_version}\r\n')
+    for code, (phrase, _) in _Handler.responses.items()
+}
+
+
+class _PooledServer(HTTPServer):
+    """Serve each connection on a fixed pool of worker threads.
+
+    Avoids creating and tearing down an OS thread per connection, and caps
+    concurrency so a burst of polls can't pile up unbounded threads (or
+    unbounded parallel calls to OpenAlgo).
+
+    Open connections are tracked so server_close() can shut their sockets
+    down: a worker parked on an idle keep-alive connection would otherwise
+    keep the process alive after Ctrl+C until the client went away.
+    """
+    # Listen backlog; the default of 5 makes bursts of polls from several
+    # tabs and the PWA proxy wait on SYN retries before being accepted
+    request_queue_size = 128
+
+    def __init__(self, server_address, handler_class, workers=HTTP_WORKERS):
+        # Set up first: HTTPServer.__init__ calls server_close() if bind fails
+        self._executor  = ThreadPoolExecutor(max_workers=workers,
+                                             thread_name_prefix='http')
+        self._open      = set()
+        self._open_lock = threading.Lock()
+        self._closing   = False
+        super().__init__(server_address, handler_class)
+
+    def process_request(self, request, client_address):
+        with self._open_lock:
+            self._open.add(request)
+        self._executor.submit(self._process_request_worker, request, client_address)
+
+    def _process_request_worker(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            with self._open_lock:
+                self._open.discard(request)
+            self.shutdown_request(request)
+
+    def handle_error(self, request, client_address):
+        if not self._closing:   # sockets shut down by server_close() are expected
+            super().handle_error(request, client_address)
+
+    def server_close(self):
+        self._closing = True
+        super().server_close()
+        self._executor.shutdown(wait=False)   # cancel_futures needs 3.9
+        with self._open_lock:
+            open_socks = list(self._open)
+        for sock in open_socks:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)   # wakes a worker blocked reading
+            except OSError:
+                pass                              # already closed by its worker
 
 
 # ── Entry point ──────────────────────────────────────────────────────────
@@ -1200,8 +1838,10 @@ if __name__ == '__main__':
     print(f"OpenAlgo URL \u2192  {OPENALGO_URL}")
     print(f"API key      \u2192  {api_status}")
     print(f"Settings     \u2192  {SETTINGS_FILE}\n")
-    server = _ThreadingServer(('0.0.0.0', port), _Handler)
+    server = _PooledServer(('0.0.0.0', port), _Handler)
     try:
         server.serve_forever()
     except KeyboardInterrupt:
         print("\nStopped.")
+    finally:
+        server.server_close()
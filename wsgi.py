@@ -0,0 +1,17 @@
+#!/usr/bin/env python3
+"""
+WSGI entry point — runs server.py under a production WSGI server
+instead of Flask's development server.
+
+  gunicorn --worker-class gthread --workers 1 --threads 32 \
+           --bind 0.0.0.0:5003 wsgi:application
+
+Keep a single worker: stored orders, the positions cache, the order-status
+poller and SSE subscribers all live in process memory. Scale with --threads.
+"""
+
+from server import app, start_order_poller
+
+start_order_poller()
+
+application = app